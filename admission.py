@@ -0,0 +1,182 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Limits are per app process. New interviews are only admitted while both hold, so
+# candidates already mid-interview keep their per-turn latency during spikes.
+
+# Interviews running at once
+MAX_ACTIVE_INTERVIEWS = int(os.environ.get("ADMISSION_MAX_INTERVIEWS", "100"))
+# Answer turns being processed at once above which new starts are held back
+MAX_INFLIGHT_TURNS = int(os.environ.get("ADMISSION_MAX_INFLIGHT_TURNS", "32"))
+# New starts allowed to wait for a slot; further candidates are turned away at once
+START_QUEUE_DEPTH = int(os.environ.get("ADMISSION_QUEUE_DEPTH", "50"))
+# Answer submissions processed at once (the submit event's concurrency limit); further
+# answers wait in Gradio's queue. 0 removes the limit
+ANSWER_CONCURRENCY = int(os.environ.get("ANSWER_CONCURRENCY", "64"))
+# A waiting candidate gives up after this long
+MAX_WAIT_SECONDS = float(os.environ.get("ADMISSION_MAX_WAIT_SECONDS", "300"))
+# Interviews with no answer for this long stop counting against capacity (the tab was
+# closed without an unload event, for instance)
+IDLE_SECONDS = float(os.environ.get("ADMISSION_IDLE_SECONDS", "900"))
+# How often a waiting candidate re-checks for a slot and gets a new estimate
+POLL_SECONDS = float(os.environ.get("ADMISSION_POLL_SECONDS", "2"))
+# Assumed interview length until real interviews have been measured
+DEFAULT_INTERVIEW_SECONDS = float(os.environ.get("ADMISSION_DEFAULT_INTERVIEW_SECONDS", "600"))
+
+class AdmissionRejected(Exception):
+    """Raised when a new interview cannot be admitted (queue full or waited too long)."""
+
+    def __init__(self, message: str, estimated_wait: float):
+        super().__init__(message)
+        self.estimated_wait = estimated_wait
+
+class AdmissionController:
+    """
+    Admits new interviews based on the load this process is actually carrying.
+
+    Running interviews hold a slot from start until they finish, the session ends or
+    they go idle. Answer turns are never queued here; instead, while too many turns are
+    in flight, waiting starts are held back, which gives in-progress interviews priority.
+    Waiting starts are admitted first come, first served.
+    """
+
+    def __init__(self, max_interviews: int = MAX_ACTIVE_INTERVIEWS, max_inflight_turns: int = MAX_INFLIGHT_TURNS,
+                 queue_depth: int = START_QUEUE_DEPTH, idle_seconds: float = IDLE_SECONDS):
+        self.max_interviews = max_interviews
+        self.max_inflight_turns = max_inflight_turns
+        self.queue_depth = queue_depth
+        self.idle_seconds = idle_seconds
+        # Handlers run both on the event loop and in worker threads (e.g. unload)
+        self._lock = threading.Lock()
+        # session_id -> (admitted_at, last_activity)
+        self._active = {}
+        self._waiting = deque()
+        self._inflight_turns = 0
+        self._mean_interview_seconds = DEFAULT_INTERVIEW_SECONDS
+
+    def _expire_idle(self):
+        # Must be called with self._lock held
+        cutoff = time.time() - self.idle_seconds
+        for session_id in [s for s, (_, last) in self._active.items() if last < cutoff]:
+            del self._active[session_id]
+            logging.info(f"Released idle interview slot for session {session_id}.")
+
+    def _has_capacity(self) -> bool:
+        return len(self._active) < self.max_interviews and self._inflight_turns < self.max_inflight_turns
+
+    def _estimated_wait(self, position: int) -> float:
+        # Slots free up at roughly max_interviews per mean interview length
+        return (position + 1) * self._mean_interview_seconds / max(1, self.max_interviews)
+
+    def _try_admit(self, session_id: str) -> bool:
+        # Must be called with self._lock held
+        if session_id in self._active:
+            return True
+        self._expire_idle()
+        head = self._waiting[0] if self._waiting else session_id
+        if head != session_id or not self._has_capacity():
+            return False
+        if self._waiting:
+            self._waiting.popleft()
+        now = time.time()
+        self._active[session_id] = (now, now)
+        return True
+
+    async def wait_for_admission(self, session_id: str):
+        """
+        Admits a new interview, waiting for a slot if necessary.
+
+        Yields:
+            float: The estimated wait in seconds, each time it is re-checked while queued.
+                   The generator ends once the session has been admitted.
+
+        Raises:
+            AdmissionRejected: The queue is full, or no slot freed up in time.
+        """
+        with self._lock:
+            if self._try_admit(session_id):
+                return
+            if session_id not in self._waiting:
+                if len(self._waiting) >= self.queue_depth:
+                    wait = self._estimated_wait(len(self._waiting))
+                    raise AdmissionRejected("The interview queue is full.", wait)
+                self._waiting.append(session_id)
+        deadline = time.monotonic() + MAX_WAIT_SECONDS
+        try:
+            while True:
+                with self._lock:
+                    if self._try_admit(session_id):
+                        return
+                    wait = self._estimated_wait(self._waiting.index(session_id))
+                if time.monotonic() >= deadline:
+                    raise AdmissionRejected("No interview slot became free in time.", wait)
+                yield wait
+                await asyncio.sleep(POLL_SECONDS)
+        finally:
+            with self._lock:
+                if session_id in self._waiting:
+                    self._waiting.remove(session_id)
+
+    def release(self, session_id: str, completed: bool = False):
+        """Frees a session's slot; completed interviews update the measured interview length."""
+        with self._lock:
+            entry = self._active.pop(session_id, None)
+            if entry and completed:
+                duration = time.time() - entry[0]
+                # Exponentially weighted, so the estimate follows the current mix of interviews
+                self._mean_interview_seconds = 0.8 * self._mean_interview_seconds + 0.2 * duration
+
+    @contextmanager
+    def turn(self, session_id: str):
+        """Counts an answer turn as in flight for the duration of the block."""
+        with self._lock:
+            self._inflight_turns += 1
+            if session_id in self._active:
+                self._active[session_id] = (self._active[session_id][0], time.time())
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight_turns -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_interviews": len(self._active),
+                "waiting_starts": len(self._waiting),
+                "inflight_turns": self._inflight_turns,
+                "mean_interview_seconds": round(self._mean_interview_seconds, 1),
+            }
+
+    def render_prometheus(self) -> str:
+        """Renders the admission gauges in the Prometheus text format."""
+        lines = []
+        for name, value in self.stats().items():
+            lines.append(f"# TYPE interview_admission_{name} gauge")
+            lines.append(f"interview_admission_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def format_wait(seconds: float) -> str:
+    """Formats an estimated wait for candidates, e.g. "about 3 minutes"."""
+    if seconds < 60:
+        return "less than a minute"
+    minutes = round(seconds / 60)
+    return f"about {minutes} minute{'s' if minutes != 1 else ''}"
+
+_default_controller = None
+
+def get_admission_controller() -> AdmissionController:
+    """Returns the process-wide admission controller."""
+    global _default_controller
+    if _default_controller is None:
+        _default_controller = AdmissionController()
+    return _default_controller
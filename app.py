@@ -1,127 +1,506 @@
 import gradio as gr
-import time
+import asyncio
+import uuid
+import weakref
 import logging
 
+# Settings are read from the environment when modules are imported, so a local .env file
+# is loaded first, here at the entry point rather than inside any library module
+from clients import load_environment
+load_environment()
+
 # Import utility functions from other modules
-from llm_utils import generate_questions, evaluate_answer, get_interview_summary
-from stt_utils import transcribe_audio
-from tts_utils import speak_text
+from llm_utils import (evaluate_answer_async, evaluate_answer_stream, get_interview_summary_async,
+                       get_interview_summary_stream, evaluate_interview_async, prescore_answer,
+                       update_running_summary_async, average_score,
+                       LLM_STREAMING, UNTRANSCRIBED_ANSWER, EVALUATION_MODE, RUNNING_SUMMARY)
+from question_bank import get_question_bank
+from stt_utils import transcribe_audio_async, speech_duration
+from tts_utils import (speak_text, speak_text_async, speak_text_stream_async, split_sentences,
+                       get_audio_duration_async, TRANSITION_TEXT, TTS_STREAMING)
+from audio_prefetch import start_prefetch, get_prefetcher, cancel_prefetch
+from stt_streaming import STT_STREAMING, get_stream_transcriber, pop_stream_transcriber
+from metrics import span, registry, run_in_session, iterate_in_session
+from session_store import get_session_store
+from admission import get_admission_controller, AdmissionRejected, format_wait, ANSWER_CONCURRENCY
+from report_export import render_report_async
+from webcam_monitor import WEBCAM_MONITORING, WEBCAM_SAMPLE_FPS, submit_frame, take_question_counters, pop_monitor
+import llm_backend
+import memo_cache
+import resilience
+import startup
+import webcam_monitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# Used when the transition clip's real duration cannot be determined
+TRANSITION_FALLBACK_SECONDS = 2
+
 # --- State Management ---
-def initialize_state():
+# Interview state lives in the session store, keyed by session ID; the browser only
+# holds the ID. Any worker process can therefore serve any event, and sessions survive
+# a restart of the app.
+
+def initialize_state(session_id=None):
     """Returns a dictionary representing the initial state of the interview."""
     return {
+        "session_id": session_id or uuid.uuid4().hex,
         "candidate_name": "",
         "role": "",
         "questions": [],
         "evaluations": [],
         "current_question_index": 0,
+        # Mean score so far, and compact notes on the first `summarized_turns` answers that
+        # are kept up to date in the background for the final summary
+        "running_score": 0,
+        "running_summary": "",
+        "summarized_turns": 0,
+        # Final score and summary once the interview is complete (printed in the PDF report)
+        "summary": None,
+        # Rendered question/transition audio by text, filled in by the prefetcher
+        "audio_paths": {},
     }
 
+def load_state(session_id):
+    """Returns a session's state from the store, or None if it is unknown or has expired."""
+    state = get_session_store().load(session_id)
+    if state is not None:
+        # Audio paths are local to the process that rendered them and are not stored
+        prefetcher = get_prefetcher(session_id)
+        state["audio_paths"] = prefetcher.audio_paths if prefetcher else {}
+    return state
+
+def save_state(state):
+    """Writes a session's state back to the store."""
+    get_session_store().save(state["session_id"], {k: v for k, v in state.items() if k != "audio_paths"})
+
+# The store may block (SQLite waits up to its busy timeout for other writers), so the
+# async handlers use these variants to keep that wait off the event loop
+async def load_state_async(session_id):
+    return await asyncio.to_thread(load_state, session_id)
+
+async def save_state_async(state):
+    await asyncio.to_thread(save_state, state)
+
+# One lock per interview session. Answers within a session are processed strictly in
+# order, while different sessions run concurrently on the event loop. Entries vanish
+# automatically once no handler holds or waits on the lock. The locks are per process, so
+# multi-worker deployments must route a session's requests to one worker (sticky sessions).
+_session_locks = weakref.WeakValueDictionary()
+
+def get_session_lock(session_id: str) -> asyncio.Lock:
+    """Returns the lock serializing answer processing for a single session."""
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+# Per session, the latest background update of the running summary. Updates are chained
+# so they fold answers into the notes in order.
+_running_summary_tasks = {}
+
+async def _update_running_summary(session_id, previous):
+    if previous:
+        await asyncio.gather(previous, return_exceptions=True)
+    state = await load_state_async(session_id)
+    if state is None:
+        return
+    first_turn = state["summarized_turns"]
+    new_evaluations = state["evaluations"][first_turn:]
+    if not new_evaluations:
+        return
+    # The LLM call runs without the session lock, so the candidate's next answer isn't held up
+    notes = await update_running_summary_async(state["running_summary"], new_evaluations, first_turn)
+    if notes is None:
+        # The next update (or the final summary) picks these answers up instead
+        return
+    async with get_session_lock(session_id):
+        state = await load_state_async(session_id)
+        if state is None or state["summarized_turns"] != first_turn:
+            return
+        state["running_summary"] = notes
+        state["summarized_turns"] = first_turn + len(new_evaluations)
+        await save_state_async(state)
+
+def schedule_running_summary(session_id):
+    """Starts a background update of the session's running summary after the latest evaluation."""
+    previous = _running_summary_tasks.get(session_id)
+    task = asyncio.create_task(run_in_session(session_id, _update_running_summary(session_id, previous)))
+    _running_summary_tasks[session_id] = task
+    task.add_done_callback(lambda t: _running_summary_tasks.pop(session_id, None) if _running_summary_tasks.get(session_id) is t else None)
+
+async def wait_for_running_summary(session_id):
+    """Waits for the session's pending running-summary update, if any."""
+    task = _running_summary_tasks.get(session_id)
+    if task:
+        await asyncio.gather(task, return_exceptions=True)
+
 # --- Core Interview Logic ---
 
-def start_interview(name, role, num_questions):
+async def start_interview(name, role, num_questions, request: gr.Request = None):
     """
     Initializes the interview state, generates questions, and prepares the UI for the first question.
+    The first output is the session ID under which the state is stored.
+
+    New interviews go through admission control first; while the candidate waits for a
+    slot, the setup screen shows the estimated wait.
     """
     if not name or not role:
         # Show an error message if name or role is missing
         gr.Warning("Please enter both your name and the job role.")
-        return None, None, gr.update(visible=True), gr.update(visible=False), gr.update(value=""), gr.update(value=None)
+        yield None, None, gr.update(visible=True), gr.update(visible=False), gr.update(value=""), gr.update(value=None), gr.update(visible=False)
+        return
         
-    logging.info(f"Starting interview for {name} for the role of {role}.")
-    
     # Create a new state for the session
-    state = initialize_state()
+    state = initialize_state(request.session_hash if request else None)
     state["candidate_name"] = name
     state["role"] = role
+
+    admission = get_admission_controller()
+    try:
+        async for wait in admission.wait_for_admission(state["session_id"]):
+            status = f"⏳ All interviewers are busy right now. Estimated wait: {format_wait(wait)}. Please keep this page open."
+            yield None, gr.update(), gr.update(visible=True), gr.update(visible=False), gr.update(), gr.update(), gr.update(value=status, visible=True)
+    except AdmissionRejected as e:
+        logging.warning(f"Interview for session {state['session_id']} not admitted: {e}")
+        status = f"We're at capacity right now. Please try again in {format_wait(e.estimated_wait)}."
+        yield None, gr.update(), gr.update(visible=True), gr.update(visible=False), gr.update(), gr.update(), gr.update(value=status, visible=True)
+        return
+
+    try:
+        logging.info(f"Starting interview for {name} for the role of {role}.")
+
+        # Sample questions from the role's pool, falling back to live generation and then static questions
+        with span("sample_questions", session_id=state["session_id"]):
+            questions = await run_in_session(state["session_id"], get_question_bank().sample_async(role, int(num_questions)))
+        state["questions"] = questions
     
-    # Generate questions using the LLM
-    questions = generate_questions(role, int(num_questions))
-    state["questions"] = questions
-    
-    if not questions:
-        gr.Error("Failed to generate interview questions. Please try again.")
-        return None, None, gr.update(visible=True), gr.update(visible=False), gr.update(value=""), gr.update(value=None)
+        if not questions:
+            admission.release(state["session_id"])
+            gr.Warning("Failed to generate interview questions. Please try again.")
+            yield None, None, gr.update(visible=True), gr.update(visible=False), gr.update(value=""), gr.update(value=None), gr.update(visible=False)
+            return
 
-    # Get the first question and its audio
-    first_question_text = questions[0]['text']
-    audio_path = speak_text(first_question_text)
-    progress_text = f"Question 1 of {len(questions)}"
+        # Render every question (and the transition clip) in the background, first question first
+        first_question_text = questions[0]['text']
+        utterances = [first_question_text, TRANSITION_TEXT] + [q['text'] for q in questions[1:]]
+        if TTS_STREAMING:
+            # The first question is streamed right away below; the rest are prefetched per sentence.
+            # The transition still plays as one clip ahead of the next question, so it is also
+            # prefetched whole.
+            utterances = [TRANSITION_TEXT] + [chunk for text in utterances[1:] for chunk in split_sentences(text)]
+        start_prefetch(state["session_id"], utterances, state["audio_paths"])
+        await save_state_async(state)
+        progress_text = f"Question 1 of {len(questions)}"
 
-    # Update UI components: hide setup, show interview
-    return state, gr.update(value=progress_text), gr.update(visible=False), gr.update(visible=True), gr.update(value=first_question_text), gr.update(value=audio_path)
+        # Update UI components: hide setup, show interview
+        async for audio_path in iterate_in_session(state["session_id"], iter_utterance_audio(state, first_question_text)):
+            yield state["session_id"], gr.update(value=progress_text), gr.update(visible=False), gr.update(visible=True), gr.update(value=first_question_text), audio_path, gr.update(visible=False)
+    except BaseException:
+        # Whatever fails after admission (question sampling, saving the state, the first
+        # question's audio) must not keep holding the interview slot
+        admission.release(state["session_id"])
+        cancel_prefetch(state["session_id"])
+        raise
 
-def process_answer(state, audio_input):
+async def get_utterance_audio(state, text):
+    """
+    Returns the audio file for an utterance, preferring the session's prefetched clips.
+    Falls back to synthesizing it directly if it was never scheduled or prefetch failed.
+    """
+    path = state["audio_paths"].get(text)
+    if path:
+        return path
+    prefetcher = get_prefetcher(state["session_id"])
+    if prefetcher:
+        path = await prefetcher.wait_for(text)
+    return path or await speak_text_async(text)
+
+async def iter_utterance_audio(state, text):
+    """
+    Yields the audio for an utterance: a single clip, or with TTS_STREAMING enabled,
+    one clip per sentence in playback order as soon as each is ready.
+    """
+    if not TTS_STREAMING:
+        yield await get_utterance_audio(state, text)
+        return
+    # Prefetched sentences are a dictionary lookup; anything else is synthesized now
+    engine = lambda sentence: state["audio_paths"].get(sentence) or speak_text(sentence)
+    produced = False
+    async for path in speak_text_stream_async(text, engine=engine):
+        produced = True
+        yield path
+    if not produced:
+        # Still update the rest of the UI when synthesis failed entirely
+        yield None
+
+def end_session(request: gr.Request):
+    """Releases background work and the interview slot of a session whose browser tab has gone away."""
+    get_admission_controller().release(request.session_hash)
+    cancel_prefetch(request.session_hash)
+    pop_stream_transcriber(request.session_hash)
+    pop_monitor(request.session_hash)
+
+def stream_answer_audio(session_id, chunk):
+    """Feeds a streamed microphone chunk to the session's incremental transcriber."""
+    if chunk is None or not session_id:
+        return
+    sample_rate, samples = chunk
+    get_stream_transcriber(session_id, create=True).add_chunk(sample_rate, samples)
+
+def stream_webcam_frame(session_id, frame):
+    """Hands a streamed webcam frame to the background monitor; the answer pipeline never waits on it."""
+    submit_frame(session_id, frame)
+
+def _answer_updates(progress=None, question=None, audio=None, submit=None,
+                    interview_screen=None, results_screen=None, final_score=None, summary=None, feedback=None):
+    """Builds the output tuple for process_answer; components left as None are not changed."""
+    updates = (progress, question, audio, submit, interview_screen, results_screen, final_score, summary, feedback)
+    return tuple(gr.update() if u is None else u for u in updates)
+
+def _feedback_text(evaluation):
+    """Formats a (possibly still streaming) evaluation for the feedback box."""
+    if evaluation.get("pending"):
+        return "Answer recorded. You'll get feedback on every answer at the end of the interview."
+    score = evaluation.get("score")
+    header = f"Score: {score} / 10\n\n" if score is not None else ""
+    return header + evaluation.get("feedback", "")
+
+def _results_breakdown(evaluations):
+    """Lists each answer's score and feedback for the results screen."""
+    return "\n\n".join(
+        f"Question {i + 1} ({e.get('score', 0)} / 10): {e.get('feedback', '')}" for i, e in enumerate(evaluations)
+    )
+
+async def _drain_queue(queue, task):
+    """Yields items put on the queue until the task finishes, then any that are left."""
+    while not task.done():
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            yield getter.result()
+        else:
+            getter.cancel()
+    while not queue.empty():
+        yield queue.get_nowait()
+
+async def _transcribe_and_evaluate(question_text, audio_input, transcriber=None, partials=None):
+    """
+    Runs the STT -> evaluation stage and returns the transcript with its evaluation.
+    With LLM_STREAMING, partial evaluations are also put on the `partials` queue as they arrive.
+    """
+    # 1. Transcribe audio to text; a streaming transcriber only has its last segment left.
+    # The speech duration feeds the local pre-scorer.
+    if transcriber:
+        transcribed_answer = await transcriber.finish_async()
+        speech_seconds = transcriber.speech_seconds
+    else:
+        transcribed_answer, speech_seconds = await asyncio.gather(
+            transcribe_audio_async(audio_input), asyncio.to_thread(speech_duration, audio_input))
+    if not transcribed_answer:
+        transcribed_answer = UNTRANSCRIBED_ANSWER
+
+    # 2. Evaluate the answer; non-substantive answers are scored locally without the LLM
+    if EVALUATION_MODE == "deferred":
+        # Substantive answers are scored together when the interview ends
+        evaluation = prescore_answer(question_text, transcribed_answer, speech_seconds) or {"pending": True}
+    elif LLM_STREAMING:
+        async for evaluation in evaluate_answer_stream(question_text, transcribed_answer, speech_seconds):
+            if partials is not None:
+                partials.put_nowait(evaluation)
+    else:
+        evaluation = await evaluate_answer_async(question_text, transcribed_answer, speech_seconds)
+    return transcribed_answer, evaluation
+
+async def process_answer(session_id, audio_input):
     """
     Processes the candidate's audio answer: transcribes, evaluates, and prepares the next question.
+    The session's state is read from and written back to the session store.
+
+    The work is staged so that everything independent of the evaluation runs alongside it:
+    the next question is already known from state["questions"], so its audio and the
+    transition clip are synthesized while STT and evaluation are still in flight.
     """
-    if not audio_input:
+    if await load_state_async(session_id) is None:
+        gr.Warning("Your interview session has expired. Please start a new interview.")
+        yield _answer_updates(submit=gr.update(interactive=True))
+        return
+
+    if STT_STREAMING:
+        transcriber = get_stream_transcriber(session_id)
+        has_answer = transcriber is not None and transcriber.has_audio
+    else:
+        has_answer = bool(audio_input)
+    if not has_answer:
         gr.Warning("Please record your answer before submitting.")
-        # Return state and no-op UI updates
-        return state, gr.update(), gr.update(), gr.update(), gr.update(interactive=True)
+        # Return no-op UI updates
+        yield _answer_updates(submit=gr.update(interactive=True))
+        return
 
     # Disable the submit button to prevent multiple submissions
-    yield state, gr.update(), gr.update(), gr.update(value="Processing..."), gr.update(interactive=False)
+    yield _answer_updates(progress=gr.update(value="Processing..."), submit=gr.update(interactive=False))
 
-    # 1. Transcribe audio to text
-    transcribed_answer = transcribe_audio(audio_input)
-    if not transcribed_answer:
-        transcribed_answer = "(Audio could not be transcribed)"
+    # The whole turn, from submission until the next question (or results) is ready; it
+    # counts as in-flight load for admission control
+    with span("answer_turn", session_id=session_id), get_admission_controller().turn(session_id):
+        async with get_session_lock(session_id):
+            # Read the state under the lock so it reflects the session's previous answer
+            state = await load_state_async(session_id)
+            if state is None:
+                # Evicted (or ended) while this answer waited for the lock
+                gr.Warning("Your interview session has expired. Please start a new interview.")
+                yield _answer_updates(submit=gr.update(interactive=True))
+                return
+            current_index = state["current_question_index"]
+            current_question = state["questions"][current_index]['text']
+            has_next_question = current_index + 1 < len(state["questions"])
+
+            # Start all stages at once; only the evaluation depends on the candidate's answer
+            transcriber = pop_stream_transcriber(session_id) if STT_STREAMING else None
+            partial_evaluations = asyncio.Queue()
+            evaluation_task = asyncio.create_task(run_in_session(
+                session_id, _transcribe_and_evaluate(current_question, audio_input, transcriber, partial_evaluations)))
+            tasks = [evaluation_task]
+            if has_next_question:
+                next_question_text = state["questions"][current_index + 1]['text']
+                transition_task = asyncio.create_task(run_in_session(session_id, get_utterance_audio(state, TRANSITION_TEXT)))
+                tasks.append(transition_task)
+                if not TTS_STREAMING:
+                    # In streaming mode the question is synthesized sentence by sentence below
+                    next_audio_task = asyncio.create_task(run_in_session(session_id, get_utterance_audio(state, next_question_text)))
+                    tasks.append(next_audio_task)
+
+            try:
+                transition_ends_at = None
+                if has_next_question:
+                    # Play the transition as soon as it exists, while evaluation continues
+                    ai_response_audio = await transition_task
+                    yield _answer_updates(progress=gr.update(value="AI is responding..."), audio=ai_response_audio,
+                                          submit=gr.update(interactive=False))
+                    if not TTS_STREAMING:
+                        duration = await get_audio_duration_async(ai_response_audio)
+                        transition_ends_at = asyncio.get_running_loop().time() + (duration or TRANSITION_FALLBACK_SECONDS)
 
-    # 2. Evaluate the answer
-    current_question = state["questions"][state["current_question_index"]]['text']
-    evaluation = evaluate_answer(current_question, transcribed_answer)
+                # Show the feedback as it streams in (better_answer is not displayed, so skip its updates)
+                shown_feedback = None
+                async for partial in _drain_queue(partial_evaluations, evaluation_task):
+                    if _feedback_text(partial) != shown_feedback:
+                        shown_feedback = _feedback_text(partial)
+                        yield _answer_updates(feedback=shown_feedback)
+                transcribed_answer, evaluation = await evaluation_task
+            except BaseException:
+                # If the turn fails or the client goes away mid-turn, don't leave orphaned
+                # synthesis running. On success the next question's audio is awaited below.
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                raise
 
-    # 3. Store the evaluation details in the state
-    state["evaluations"].append({
-        "question": current_question,
-        "answer": transcribed_answer,
-        **evaluation
-    })
+            # 3. Store the evaluation details in the state
+            state["evaluations"].append({
+                "question": current_question,
+                "answer": transcribed_answer,
+                **evaluation
+            })
 
-    # 4. Move to the next question
-    state["current_question_index"] += 1
+            if WEBCAM_MONITORING:
+                # Presence, motion and face-in-frame counts while this question was showing
+                state["evaluations"][-1]["monitoring"] = take_question_counters(session_id)
+            state["running_score"] = average_score(state["evaluations"])
+
+            # 4. Move to the next question
+            state["current_question_index"] += 1
+            await save_state_async(state)
+            if RUNNING_SUMMARY and EVALUATION_MODE != "deferred" and has_next_question:
+                schedule_running_summary(session_id)
+
+            if has_next_question and not TTS_STREAMING:
+                question_audio_path = await next_audio_task
+                # Let the transition clip finish before replacing it with the next question
+                remaining = transition_ends_at - asyncio.get_running_loop().time()
+                if remaining > 0:
+                    with span("transition_wait", session_id=session_id):
+                        await asyncio.sleep(remaining)
 
     # Check if the interview is over
-    if state["current_question_index"] >= len(state["questions"]):
+    if not has_next_question:
         # Interview is finished, show the results
-        summary_data = get_interview_summary(state["evaluations"])
-        final_score_text = f"Final Score: {summary_data['final_score']} / 10"
-        summary_text = summary_data['summary']
-        
-        # Display results and hide the interview UI
-        yield state, gr.update(visible=False), gr.update(visible=True), gr.update(value=final_score_text), gr.update(value=summary_text)
+        get_admission_controller().release(session_id, completed=True)
+        cancel_prefetch(session_id)
+        pop_monitor(session_id)
+        if EVALUATION_MODE == "deferred":
+            yield _answer_updates(interview_screen=gr.update(visible=False), results_screen=gr.update(visible=True),
+                                  final_score=gr.update(value="Scoring your answers..."), summary=gr.update(value=""))
+            summary_data = await run_in_session(session_id, evaluate_interview_async(state["evaluations"]))
+            state["evaluations"] = summary_data["evaluations"]
+            state["summary"] = {"final_score": summary_data["final_score"], "summary": summary_data["summary"]}
+            await save_state_async(state)
+            final_score_text = f"Final Score: {summary_data['final_score']} / 10"
+            # Feedback was held back during the interview, so it is listed with the summary
+            summary_text = summary_data['summary'] + "\n\n" + _results_breakdown(state["evaluations"])
+            yield _answer_updates(final_score=gr.update(value=final_score_text), summary=gr.update(value=summary_text))
+        else:
+            # Normally only the final answer is not yet folded into the running notes
+            await wait_for_running_summary(session_id)
+            state = await load_state_async(session_id) or state
+            summary_args = (state["evaluations"], state["running_summary"], state["summarized_turns"])
+            if LLM_STREAMING:
+                # The results screen opens with the score while the summary streams in
+                async for summary_data in iterate_in_session(session_id, get_interview_summary_stream(*summary_args)):
+                    final_score_text = f"Final Score: {summary_data['final_score']} / 10"
+                    yield _answer_updates(interview_screen=gr.update(visible=False), results_screen=gr.update(visible=True),
+                                          final_score=gr.update(value=final_score_text), summary=gr.update(value=summary_data['summary']))
+                state["summary"] = {"final_score": summary_data["final_score"], "summary": summary_data["summary"]}
+                await save_state_async(state)
+            else:
+                summary_data = await run_in_session(session_id, get_interview_summary_async(*summary_args))
+                state["summary"] = {"final_score": summary_data["final_score"], "summary": summary_data["summary"]}
+                await save_state_async(state)
+                final_score_text = f"Final Score: {summary_data['final_score']} / 10"
+                summary_text = summary_data['summary']
+
+                # Display results and hide the interview UI
+                yield _answer_updates(interview_screen=gr.update(visible=False), results_screen=gr.update(visible=True),
+                                      final_score=gr.update(value=final_score_text), summary=gr.update(value=summary_text))
     else:
-        # Ask the next question
-        next_question_index = state["current_question_index"]
-        next_question_text = state["questions"][next_question_index]['text']
-        
-        # Generate appreciation and transition
-        ai_response = f"Thank you for your answer. Now for the next question."
-        ai_response_audio = speak_text(ai_response)
-        
-        # Update UI with appreciation message
-        yield state, gr.update(), gr.update(value="AI is responding..."), gr.update(value=ai_response_audio), gr.update(interactive=False)
-        time.sleep(2) # Give user time to hear the transition
-        
-        # Generate audio for the next question
-        question_audio_path = speak_text(next_question_text)
-        
         # Update progress and question text
+        next_question_index = state["current_question_index"]
         progress_text = f"Question {next_question_index + 1} of {len(state['questions'])}"
         
         # Re-enable submit button and update UI for the next question
-        yield state, gr.update(value=progress_text), gr.update(value=next_question_text), gr.update(value=question_audio_path), gr.update(interactive=True)
+        if TTS_STREAMING:
+            # Chunks queue up behind the transition clip in the streaming player
+            async for chunk_path in iterate_in_session(session_id, iter_utterance_audio(state, next_question_text)):
+                yield _answer_updates(progress=gr.update(value=progress_text), question=gr.update(value=next_question_text),
+                                      audio=chunk_path, submit=gr.update(interactive=True), feedback=_feedback_text(evaluation))
+        else:
+            yield _answer_updates(progress=gr.update(value=progress_text), question=gr.update(value=next_question_text),
+                                  audio=gr.update(value=question_audio_path), submit=gr.update(interactive=True),
+                                  feedback=_feedback_text(evaluation))
+
+async def request_report(session_id):
+    """
+    Returns the session's PDF report for download. Rendering happens in the report
+    process pool (or not at all if an identical report is cached), never on the event loop.
+    """
+    state = await load_state_async(session_id)
+    if state is None or not state["evaluations"]:
+        gr.Warning("There is no completed interview to report on.")
+        return gr.update()
+    with span("render_report", session_id=session_id):
+        path = await render_report_async(state)
+    if not path:
+        gr.Warning("The report could not be generated. Please try again.")
+        return gr.update()
+    return gr.update(value=path, visible=True)
 
 # --- Gradio UI Definition ---
 with gr.Blocks(theme=gr.themes.Soft(), title="AI Interviewer") as demo:
     
-    # State object to hold session data
-    state = gr.State(value=initialize_state())
+    # The session ID is the only state kept in the browser; it is sent with every event
+    session_id_box = gr.Textbox(visible=False)
     
     gr.Markdown("# 🤖 AI Interviewer")
     gr.Markdown("Welcome! Please set up your interview, and the AI will guide you through the questions.")
@@ -133,18 +512,21 @@ with gr.Blocks(theme=gr.themes.Soft(), title="AI Interviewer") as demo:
             role_input = gr.Textbox(label="Job Role You're Applying For")
             num_questions_slider = gr.Slider(minimum=3, maximum=10, value=5, step=1, label="Number of Questions")
             start_button = gr.Button("Start Interview", variant="primary")
+            admission_status = gr.Markdown(visible=False)
 
     # --- 2. Interview Screen ---
     with gr.Row(visible=False) as interview_screen:
         with gr.Column(scale=2):
             progress_label = gr.Label(value="Question 1 of 5")
             webcam_feed = gr.Image(sources=["webcam"], label="Live Monitoring", streaming=True)
-            question_audio = gr.Audio(autoplay=True, interactive=False, label="AI Interviewer")
+            question_audio = gr.Audio(autoplay=True, interactive=False, streaming=TTS_STREAMING, label="AI Interviewer")
             question_display = gr.Textbox(label="Current Question", interactive=False, lines=3)
         with gr.Column(scale=3):
             gr.Markdown("### Record Your Answer")
-            audio_answer_input = gr.Audio(sources=["microphone"], type="filepath", label="Speak your answer here")
+            audio_answer_input = gr.Audio(sources=["microphone"], type="numpy" if STT_STREAMING else "filepath",
+                                          streaming=STT_STREAMING, label="Speak your answer here")
             submit_answer_button = gr.Button("Submit Answer", variant="primary")
+            feedback_display = gr.Textbox(label="Feedback on Your Last Answer", interactive=False, lines=4)
             
     # --- 3. Results Screen ---
     with gr.Column(visible=False) as results_screen:
@@ -152,25 +534,98 @@ with gr.Blocks(theme=gr.themes.Soft(), title="AI Interviewer") as demo:
         gr.Markdown("Thank you for completing the interview. Here is your summary.")
         final_score_display = gr.Label(label="Overall Performance")
         summary_display = gr.Textbox(label="Interview Summary", interactive=False, lines=8)
+        report_button = gr.Button("Download PDF Report")
+        report_file = gr.File(label="Interview Report", interactive=False, visible=False)
 
 
     # --- Event Handling Logic ---
     start_button.click(
         fn=start_interview,
         inputs=[candidate_name_input, role_input, num_questions_slider],
-        outputs=[state, progress_label, setup_screen, interview_screen, question_display, question_audio]
+        outputs=[session_id_box, progress_label, setup_screen, interview_screen, question_display, question_audio, admission_status],
+        # Admission control bounds (and queues) new interviews itself, so waiting candidates
+        # must not occupy the event's concurrency slots
+        concurrency_limit=None,
+        trigger_mode="once"
     )
 
     submit_answer_button.click(
         fn=process_answer,
-        inputs=[state, audio_answer_input],
-        outputs=[state, interview_screen, results_screen, final_score_display, summary_display],
-        concurrency_limit=1 # Prevent multiple clicks while processing
+        inputs=[session_id_box, audio_answer_input],
+        outputs=[progress_label, question_display, question_audio, submit_answer_button,
+                 interview_screen, results_screen, final_score_display, summary_display, feedback_display],
+        # Sessions are serialized by their own lock; the event limit only caps how many
+        # answers the process works on at once, and "once" ignores repeat clicks while an
+        # answer is in flight.
+        concurrency_limit=ANSWER_CONCURRENCY or None,
+        trigger_mode="once"
     ).then(
         fn=lambda: (gr.update(value=None), gr.update(interactive=True)), # Clear audio and re-enable button after processing
         outputs=[audio_answer_input, submit_answer_button]
     )
 
+    report_button.click(
+        fn=request_report,
+        inputs=[session_id_box],
+        outputs=[report_file],
+        # Rendering runs in worker processes, so the event needs no global limit
+        concurrency_limit=None,
+        trigger_mode="once"
+    )
+
+    if STT_STREAMING:
+        # Transcribe the answer segment by segment while it is being recorded
+        audio_answer_input.stream(
+            fn=stream_answer_audio,
+            inputs=[session_id_box, audio_answer_input],
+            outputs=None,
+        )
+
+    if WEBCAM_MONITORING:
+        # The browser sends frames at the sampling rate; the handler only queues them
+        webcam_feed.stream(
+            fn=stream_webcam_frame,
+            inputs=[session_id_box, webcam_feed],
+            outputs=None,
+            stream_every=1.0 / WEBCAM_SAMPLE_FPS,
+            concurrency_limit=None,
+        )
+
+    # Stop prefetching for candidates who close the tab mid-interview
+    demo.unload(end_session)
+
+
+def create_server():
+    """
+    Returns a FastAPI app serving the Gradio UI at / and Prometheus metrics at /metrics.
+    The process is reported ready (see startup.py) once the server has started up.
+    """
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+
+    @asynccontextmanager
+    async def lifespan(app):
+        startup.mark_ready()
+        yield
+
+    server = FastAPI(lifespan=lifespan)
+
+    @server.get("/metrics", response_class=PlainTextResponse)
+    def metrics_endpoint():
+        return (registry.render_prometheus() + resilience.render_prometheus()
+                + get_admission_controller().render_prometheus() + startup.render_prometheus()
+                + webcam_monitor.render_prometheus() + memo_cache.render_prometheus()
+                + llm_backend.render_prometheus())
+
+    return gr.mount_gradio_app(server, demo, path="/")
 
 if __name__ == "__main__":
-    demo.launch(debug=True)
+    import os
+    import uvicorn
+
+    uvicorn.run(
+        create_server(),
+        host=os.environ.get("GRADIO_SERVER_NAME", "127.0.0.1"),
+        port=int(os.environ.get("GRADIO_SERVER_PORT", "7860")),
+    )
@@ -0,0 +1,147 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import tts_utils
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Size of the thread pool shared by every session's prefetcher
+PREFETCH_MAX_WORKERS = int(os.environ.get("TTS_PREFETCH_MAX_WORKERS", "8"))
+# Maximum number of clips a single session may have in the pool at once, so one
+# large interview cannot occupy every worker while other sessions wait
+PREFETCH_PER_SESSION = int(os.environ.get("TTS_PREFETCH_PER_SESSION", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="tts-prefetch")
+
+# Active prefetchers by session ID
+_prefetchers = {}
+_prefetchers_lock = threading.Lock()
+
+class AudioPrefetcher:
+    """
+    Renders a session's utterances in the background through the shared TTS pool.
+
+    Texts are rendered in the order given, at most PREFETCH_PER_SESSION at a time.
+    Each finished clip's file path is recorded in the `audio_paths` mapping (normally
+    state["audio_paths"]) so the answer pipeline only needs a dictionary lookup.
+    """
+
+    def __init__(self, session_id: str, texts: list, audio_paths: dict):
+        self.session_id = session_id
+        self.audio_paths = audio_paths
+        self._pending = [t for t in dict.fromkeys(texts) if t not in audio_paths]
+        self._futures = {}
+        # Re-entrant: a future that is already done runs its callback inside _submit_next
+        self._lock = threading.RLock()
+        self._cancelled = False
+
+    def start(self):
+        """Submits the first batch of texts to the shared pool."""
+        with self._lock:
+            for _ in range(PREFETCH_PER_SESSION):
+                self._submit_next()
+        return self
+
+    def _submit_next(self):
+        # Must be called with self._lock held
+        if self._cancelled or not self._pending:
+            return
+        text = self._pending.pop(0)
+        future = _executor.submit(self._render, text)
+        self._futures[text] = future
+        future.add_done_callback(self._on_done)
+
+    def _render(self, text: str) -> str:
+        if self._cancelled:
+            return None
+        with metrics.session(self.session_id):
+            path = tts_utils.speak_text(text)
+        if path:
+            self.audio_paths[text] = path
+        return path
+
+    def _on_done(self, future):
+        with self._lock:
+            self._submit_next()
+            if not self._pending and all(f.done() for f in self._futures.values()):
+                logging.info(f"Prefetched audio for session {self.session_id}: {len(self.audio_paths)} clip(s).")
+
+    async def wait_for(self, text: str) -> str:
+        """
+        Waits for a text to be rendered and returns its file path.
+
+        Returns:
+            str: The file path, or None if the text was never scheduled or rendering failed.
+        """
+        if text in self.audio_paths:
+            return self.audio_paths[text]
+        with self._lock:
+            future = self._futures.get(text)
+            if future is None and text in self._pending and not self._cancelled:
+                # Needed right now: move it to the front of the queue
+                self._pending.remove(text)
+                self._pending.insert(0, text)
+                self._submit_next()
+                future = self._futures.get(text)
+        if future is None or future.cancelled():
+            return None
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            logging.error(f"Prefetched TTS failed for session {self.session_id}: {e}")
+            return None
+
+    def cancel(self):
+        """Stops scheduling new work and cancels clips that have not started rendering."""
+        with self._lock:
+            self._cancelled = True
+            self._pending.clear()
+            for future in self._futures.values():
+                future.cancel()
+
+def start_prefetch(session_id: str, texts: list, audio_paths: dict) -> AudioPrefetcher:
+    """
+    Starts prefetching audio for a session, replacing any prefetcher it already had.
+
+    Args:
+        session_id (str): The interview session's ID.
+        texts (list): Utterances to render, in the order they will be needed.
+        audio_paths (dict): Mapping that receives text -> file path as clips finish.
+
+    Returns:
+        AudioPrefetcher: The running prefetcher.
+    """
+    prefetcher = AudioPrefetcher(session_id, texts, audio_paths)
+    with _prefetchers_lock:
+        previous = _prefetchers.pop(session_id, None)
+        _prefetchers[session_id] = prefetcher
+    if previous:
+        previous.cancel()
+    return prefetcher.start()
+
+def get_prefetcher(session_id: str) -> AudioPrefetcher:
+    """Returns the session's active prefetcher, or None."""
+    with _prefetchers_lock:
+        return _prefetchers.get(session_id)
+
+def cancel_prefetch(session_id: str):
+    """Cancels and forgets a session's prefetcher, e.g. when the session is abandoned or finished."""
+    with _prefetchers_lock:
+        prefetcher = _prefetchers.pop(session_id, None)
+    if prefetcher:
+        prefetcher.cancel()
+        logging.info(f"Cancelled audio prefetch for session {session_id}.")
+
+def shutdown(wait: bool = True):
+    """Cancels every session's prefetch and shuts down the shared pool, e.g. at process exit."""
+    with _prefetchers_lock:
+        prefetchers = list(_prefetchers.values())
+        _prefetchers.clear()
+    for prefetcher in prefetchers:
+        prefetcher.cancel()
+    _executor.shutdown(wait=wait)
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import math
+import time
+import wave
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.mock_openai_server import start_mock_server, add_mock_arguments, mock_config_from_args
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# A stage's p95 may grow by this fraction before --compare reports a regression
+REGRESSION_THRESHOLD = 0.10
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def distribution(values: list) -> dict:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.50), 4),
+        "p95": round(percentile(values, 0.95), 4),
+        "p99": round(percentile(values, 0.99), 4),
+    }
+
+def write_answer_audio(path: str, seconds: float = 3.0, sample_rate: int = 16000):
+    """Writes a tone-like WAV to stand in for a recorded answer."""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        sample = int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate))
+        frames += sample.to_bytes(2, "little", signed=True)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(bytes(frames))
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# --- Simulated candidates ---
+
+async def timed_event(gate: asyncio.Semaphore, queue_waits: list, handler):
+    """
+    Runs one UI event (a handler generator) to completion and returns its latency.
+
+    The gate stands in for the event queue's concurrency limit; time spent waiting
+    for it is recorded as queue wait.
+    """
+    arrived = time.perf_counter()
+    async with gate:
+        started = time.perf_counter()
+        queue_waits.append(started - arrived)
+        outputs = None
+        async for outputs in handler:
+            pass
+        return time.perf_counter() - started, outputs
+
+async def run_candidate(app, index: int, args, answer_audio: str, gate, report: dict):
+    await asyncio.sleep(args.ramp * index / max(1, args.candidates))
+    try:
+        latency, outputs = await timed_event(
+            gate, report["queue_waits"], app.start_interview(f"Candidate {index}", args.role, args.questions))
+        report["start_latencies"].append(latency)
+        session_id = outputs[0]
+        if session_id is None:
+            # Turned away by admission control (or no questions could be produced)
+            report["rejected"] += 1
+            return
+        for _ in range(len((await app.load_state_async(session_id))["questions"])):
+            await asyncio.sleep(args.think_time)
+            latency, _ = await timed_event(gate, report["queue_waits"], app.process_answer(session_id, answer_audio))
+            report["turn_latencies"].append(latency)
+        report["completed"] += 1
+    except Exception as e:
+        logging.error(f"Candidate {index} failed: {e}")
+        report["errors"] += 1
+
+def read_trace(path: str) -> list:
+    """Returns the span records from a JSONL trace."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f]
+
+def stage_durations(records: list) -> dict:
+    """Groups span durations by stage."""
+    stages = {}
+    for record in records:
+        stages.setdefault(record["stage"], []).append(record["duration"])
+    return stages
+
+def fast_path_share(records: list) -> float:
+    """The fraction of answers the local pre-scorer handled without an LLM call."""
+    prescored = [r for r in records if r["stage"] == "prescore_answer"]
+    return round(sum(1 for r in prescored if r.get("fast_path")) / len(prescored), 3) if prescored else 0.0
+
+async def run_load_test(args, workdir: str) -> dict:
+    # Everything the app reads at import time must be configured first
+    import app
+    import audio_prefetch
+    from question_bank import get_question_bank
+    # The app's modules log every request at INFO, which would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    answer_audio = args.answer_audio
+    if not answer_audio:
+        answer_audio = os.path.join(workdir, "answer.wav")
+        write_answer_audio(answer_audio)
+
+    gate = asyncio.Semaphore(args.concurrency_limit or args.candidates)
+    report = {"start_latencies": [], "turn_latencies": [], "queue_waits": [], "completed": 0, "rejected": 0, "errors": 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_candidate(app, i, args, answer_audio, gate, report) for i in range(args.candidates)))
+    elapsed = time.perf_counter() - started
+
+    # Let background work finish before the temporary cache directories disappear
+    get_question_bank().wait_for_refills()
+    audio_prefetch.shutdown()
+
+    records = read_trace(os.environ["TRACE_FILE"])
+    stages = {stage: distribution(values) for stage, values in sorted(stage_durations(records).items())}
+    return {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "label")},
+        "duration_seconds": round(elapsed, 2),
+        "interviews_completed": report["completed"],
+        "interviews_rejected": report["rejected"],
+        "errors": report["errors"],
+        "throughput": {
+            "interviews_per_minute": round(report["completed"] / elapsed * 60, 2),
+            "turns_per_second": round(len(report["turn_latencies"]) / elapsed, 3),
+        },
+        "fast_path_share": fast_path_share(records),
+        "start_event": distribution(report["start_latencies"]),
+        "answer_event": distribution(report["turn_latencies"]),
+        "queue_wait": distribution(report["queue_waits"]),
+        "stages": stages,
+    }
+
+# --- Reporting ---
+
+def print_report(result: dict):
+    print(f"\n{result['label']} @ {result['git_revision']}: {result['interviews_completed']} interview(s) "
+          f"in {result['duration_seconds']} s, {result.get('interviews_rejected', 0)} rejected, {result['errors']} error(s)")
+    print(f"  throughput: {result['throughput']['interviews_per_minute']} interviews/min, "
+          f"{result['throughput']['turns_per_second']} turns/s, "
+          f"{result.get('fast_path_share', 0.0):.0%} of answers scored locally")
+    rows = [("start_event", result["start_event"]), ("answer_event", result["answer_event"]),
+            ("queue_wait", result["queue_wait"])] + list(result["stages"].items())
+    print(f"  {'stage':<26}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, dist in rows:
+        print(f"  {name:<26}{dist['count']:>7}{dist['p50']:>10.3f}{dist['p95']:>10.3f}{dist['p99']:>10.3f}")
+
+def _comparable_rows(result: dict) -> dict:
+    rows = {name: result[name] for name in ("start_event", "answer_event") if name in result}
+    rows.update(result.get("stages", {}))
+    return rows
+
+def compare_results(baseline: dict, result: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Compares p95 latencies against a baseline run.
+
+    Returns:
+        list: Names of the stages whose p95 grew by more than the threshold.
+    """
+    regressions = []
+    print(f"\np95 vs {baseline['label']} @ {baseline['git_revision']}:")
+    old_rows, new_rows = _comparable_rows(baseline), _comparable_rows(result)
+    for name, new in new_rows.items():
+        old = old_rows.get(name)
+        if not old or not old["p95"]:
+            continue
+        change = (new["p95"] - old["p95"]) / old["p95"]
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<26}{old['p95']:>10.3f} -> {new['p95']:<10.3f}{change:+.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive simulated candidates through the interview pipeline against a mock OpenAI server.")
+    parser.add_argument("--candidates", type=int, default=20, help="Number of simultaneous interviews.")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per interview.")
+    parser.add_argument("--role", default="Backend Engineer")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which candidates arrive.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds each candidate spends answering.")
+    parser.add_argument("--concurrency-limit", type=int, default=0,
+                        help="Events processed at once, like the Gradio queue's concurrency limit (0 = unlimited).")
+    parser.add_argument("--answer-audio", default=None, help="Pre-recorded answer to submit (a tone is generated if omitted).")
+    parser.add_argument("--memo-cache", action="store_true",
+                        help="Keep the transcription/evaluation memo cache on (every candidate submits the same audio, so it mostly hits).")
+    parser.add_argument("--base-url", default=None, help="Use an already running (mock) API instead of starting one.")
+    parser.add_argument("--label", default=None, help="Name of the stored result (defaults to the git revision).")
+    parser.add_argument("--compare", default=None, help="A stored result to compare p95 latencies against.")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    args.label = args.label or f"{git_revision()}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+    with tempfile.TemporaryDirectory(prefix="interview-bench-") as workdir:
+        base_url = args.base_url
+        if not base_url:
+            server = start_mock_server(mock_config_from_args(args))
+            base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        # Point every client at the mock and start from cold, isolated caches
+        os.environ.update({
+            "OPENAI_BASE_URL": base_url,
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "mock-key"),
+            "TTS_ENGINE": "openai",
+            "TRACE_FILE": os.path.join(workdir, "trace.jsonl"),
+            "TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+            "QUESTION_BANK_PATH": os.path.join(workdir, "question_bank.json"),
+            "SESSION_DB_PATH": os.path.join(workdir, "sessions.db"),
+            "MEMO_DB_PATH": os.path.join(workdir, "memo_cache.db"),
+            "MEMO_CACHE": "1" if args.memo_cache else "0",
+        })
+        result = asyncio.run(run_load_test(args, workdir))
+
+    print_report(result)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{args.label}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_results(json.load(f), result)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
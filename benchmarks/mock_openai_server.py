@@ -0,0 +1,202 @@
+import io
+import re
+import json
+import math
+import time
+import wave
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Long enough to count as a substantive answer, so evaluations go to the (mock) LLM
+MOCK_TRANSCRIPT = (
+    "In my last role I led a small team that rebuilt our checkout flow. We measured where users dropped off, "
+    "split the work into weekly releases, and reduced failed payments by a third within two months."
+)
+
+class MockConfig:
+    """
+    Latency and failure behaviour of the mock server.
+
+    Latencies are log-normal: `median * exp(sigma * N(0, 1))`, which gives the long right
+    tail typical of LLM and speech APIs. A failed request answers HTTP 500 after its
+    latency has elapsed, like a real upstream timing out on its side.
+    """
+
+    def __init__(self, chat_latency=0.8, stt_latency=0.6, tts_latency=0.4, sigma=0.5,
+                 failure_rate=0.0, seed=None):
+        self.latency = {"chat": chat_latency, "stt": stt_latency, "tts": tts_latency}
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, endpoint: str) -> tuple:
+        """Returns (latency_seconds, should_fail) for one request."""
+        with self._lock:
+            latency = self.latency[endpoint] * math.exp(self.sigma * self._random.gauss(0, 1))
+            return latency, self._random.random() < self.failure_rate
+
+# --- Canned responses ---
+
+def _chat_content(prompt: str) -> str:
+    if '"evaluations" array' in prompt:
+        count = len(re.findall(r"\[Answer \d+\]", prompt))
+        evaluation = {
+            "score": 7,
+            "feedback": "A clear, well-structured answer. Adding a concrete metric would make it stronger.",
+            "better_answer": "I led a migration that cut page load time by 40% over two sprints.",
+        }
+        content = {"evaluations": [{"index": i + 1, **evaluation} for i in range(count)]}
+        if '"summary"' in prompt:
+            content["summary"] = "The candidate communicated clearly. Their strength is structure; they should add more concrete metrics."
+        return json.dumps(content)
+    if "candidate profile" in prompt and "Resume:" in prompt:
+        return json.dumps({"skills": ["Python", "PostgreSQL", "AWS"], "total_years": 6,
+                           "roles": [{"title": "Backend Engineer", "company": "Acme", "years": 4}],
+                           "highlights": ["Rebuilt the checkout flow"]})
+    if 'key "notes"' in prompt:
+        return json.dumps({"notes": "Answers are structured and specific; the candidate leads with outcomes but rarely quantifies them."})
+    if "interview questions" in prompt:
+        match = re.search(r"Generate (\d+)", prompt)
+        count = int(match.group(1)) if match else 5
+        return json.dumps({"questions": [{"text": f"Mock question {i + 1}: tell me about a project you led."} for i in range(count)]})
+    if "summary" in prompt.lower():
+        return json.dumps({"summary": "The candidate communicated clearly. Their strength is structure; they should add more concrete metrics."})
+    return json.dumps({
+        "score": 7,
+        "feedback": "A clear, well-structured answer. Adding a concrete metric would make it stronger.",
+        "better_answer": "I led a migration that cut page load time by 40% over two sprints.",
+    })
+
+def _usage(prompt: str, content: str) -> dict:
+    # Roughly four characters per token
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+def _silent_wav(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Serves /v1/chat/completions (plain and streamed), /v1/audio/transcriptions and /v1/audio/speech."""
+
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        # Keep load-test output readable
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("/chat/completions"):
+            endpoint = "chat"
+        elif self.path.endswith("/audio/transcriptions"):
+            endpoint = "stt"
+        elif self.path.endswith("/audio/speech"):
+            endpoint = "tts"
+        else:
+            return self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        latency, fail = self.config.sample(endpoint)
+        time.sleep(latency)
+        try:
+            if fail:
+                self._send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+            elif endpoint == "chat":
+                self._chat(json.loads(body))
+            elif endpoint == "stt":
+                self._send_json(200, {"text": MOCK_TRANSCRIPT})
+            else:
+                self._send(200, _silent_wav(), "audio/wav")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout or cancelled request); nothing left to answer
+            pass
+
+    def _chat(self, request: dict):
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        # The task is in the last message; earlier ones are shared instructions and context
+        content = _chat_content(str(messages[-1].get("content", "")) if messages else "")
+        model = request.get("model", "mock")
+        if not request.get("stream"):
+            return self._send_json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": _usage(prompt, content),
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for i in range(0, len(content), 8):
+            self._send_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                              "choices": [{"index": 0, "delta": {"content": content[i:i + 8]}, "finish_reason": None}]})
+            time.sleep(0.005)
+        if request.get("stream_options", {}).get("include_usage"):
+            self._send_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                              "choices": [], "usage": _usage(prompt, content)})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_event(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def start_mock_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Starts the mock server on a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its base URL is http://host:server.server_port/v1.
+    """
+    handler = type("ConfiguredMockOpenAIHandler", (MockOpenAIHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    """Adds the mock server's latency/failure options to a command-line parser."""
+    parser.add_argument("--chat-latency", type=float, default=0.8, help="Median chat completion latency (s).")
+    parser.add_argument("--stt-latency", type=float, default=0.6, help="Median transcription latency (s).")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="Median speech synthesis latency (s).")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of all latencies.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs.")
+
+def mock_config_from_args(args) -> MockConfig:
+    return MockConfig(args.chat_latency, args.stt_latency, args.tts_latency, args.latency_sigma, args.failure_rate, args.seed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI API.")
+    parser.add_argument("--port", type=int, default=8800)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_mock_server(mock_config_from_args(args), port=args.port)
+    logging.info(f"Mock OpenAI server listening; set OPENAI_BASE_URL=http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
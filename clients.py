@@ -0,0 +1,87 @@
+import os
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Connection pool sizing for the shared async client. Every interview session in the
+# process shares these connections, so the limits bound upstream concurrency as a whole.
+MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# Clients (and the openai package itself) are loaded on first use rather than at import,
+# so a worker that never calls a given API never pays for its client.
+_client = None
+_async_client = None
+_clients_lock = threading.Lock()
+_environment_loaded = False
+
+def load_environment():
+    """
+    Loads variables from a .env file for local development, once per process.
+
+    Entry points call this before importing the modules that read their settings from the
+    environment; the client getters call it as well, so the API key is always picked up.
+    """
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    _environment_loaded = True
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        logging.warning("dotenv package not found. Make sure to set environment variables manually.")
+
+def get_client():
+    """
+    Returns the process-wide synchronous OpenAI client, creating it on first use.
+
+    Returns:
+        OpenAI: The shared client, or None if it could not be initialized.
+    """
+    global _client
+    if _client is None:
+        with _clients_lock:
+            if _client is None:
+                load_environment()
+                try:
+                    from openai import OpenAI
+                    _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+                except Exception as e:
+                    logging.error(f"Failed to initialize OpenAI client: {e}")
+                    return None
+    return _client
+
+def get_async_client():
+    """
+    Returns the process-wide AsyncOpenAI client, creating it on first use.
+
+    The client is backed by a single pooled HTTP connection pool so that concurrent
+    interviews reuse keep-alive connections instead of opening one per request.
+
+    Returns:
+        AsyncOpenAI: The shared client, or None if it could not be initialized.
+    """
+    global _async_client
+    if _async_client is None:
+        with _clients_lock:
+            if _async_client is None:
+                load_environment()
+                try:
+                    import httpx
+                    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+                    _async_client = AsyncOpenAI(
+                        api_key=os.environ.get("OPENAI_API_KEY"),
+                        http_client=DefaultAsyncHttpxClient(
+                            limits=httpx.Limits(
+                                max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                            )
+                        ),
+                    )
+                except Exception as e:
+                    logging.error(f"Failed to initialize async OpenAI client: {e}")
+                    return None
+    return _async_client
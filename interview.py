@@ -1,43 +1,148 @@
 import os
 import json
-from openai import OpenAI
+import hashlib
+import logging
+import threading
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from llm_backend import complete
+from metrics import usage_tags
 
 # Stable JSON extraction
+# A single pass over the text finds each top-level {...} or [...] span (brackets inside
+# JSON strings are ignored), and each span is parsed at most once. Objects take
+# precedence over arrays.
 def extract_first_json_block(text: str):
-    for open_char, close_char in [("{", "}"), ("[", "]")]:
-        stack = []
-        start_idx = None
-        for i, ch in enumerate(text):
-            if ch == open_char:
-                if not stack:
-                    start_idx = i
-                stack.append(ch)
-            elif ch == close_char and stack:
-                stack.pop()
-                if not stack and start_idx is not None:
-                    candidate = text[start_idx:i+1]
-                    try:
-                        return json.loads(candidate)
-                    except Exception:
-                        continue
-    return None
+    first_array = None
+    depth = 0
+    start_idx = None
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch in "{[":
+            if not depth:
+                start_idx = i
+            depth += 1
+        elif ch in "}]" and depth:
+            depth -= 1
+            if not depth:
+                try:
+                    candidate = json.loads(text[start_idx:i+1])
+                except Exception:
+                    continue
+                if isinstance(candidate, dict):
+                    return candidate
+                if first_array is None:
+                    first_array = candidate
+        elif ch == '"' and depth:
+            in_string = True
+    return first_array
+
+# Resume digest
+# The resume is condensed once into skills, roles and years, cached by content hash
+# (in memory and in RESUME_DIGEST_PATH), and every later prompt uses the digest instead.
+RESUME_DIGEST_PATH = os.getenv("RESUME_DIGEST_PATH", "resume_digests.json")
+_digests = None
+_digests_lock = threading.Lock()
+
+def resume_hash(resume_text):
+    return hashlib.sha256(" ".join((resume_text or "").split()).encode("utf-8")).hexdigest()
+
+def _load_digests():
+    try:
+        with open(RESUME_DIGEST_PATH, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_digests():
+    # Must be called with _digests_lock held
+    tmp_path = f"{RESUME_DIGEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_digests, f)
+    os.replace(tmp_path, RESUME_DIGEST_PATH)
+
+def resume_digest(resume_text):
+    global _digests
+    key = resume_hash(resume_text)
+    with _digests_lock:
+        if _digests is None:
+            _digests = _load_digests()
+        if key in _digests:
+            return _digests[key]
+    prompt = (
+        f"Resume:\n{resume_text}\n"
+        "Extract a compact candidate profile. "
+        "Return JSON: {skills (list of strings), roles (list of {title, company, years}), total_years (number), "
+        "highlights (list of at most 3 short strings)}"
+    )
+    try:
+        digest = extract_first_json_block(_chat("resume_digest", [{"role":"user","content":prompt}]))
+    except Exception:
+        digest = None
+    if not isinstance(digest, dict):
+        # Not cached, so the next call tries again; meanwhile the prompts carry the resume itself
+        return {"resume": resume_text}
+    with _digests_lock:
+        _digests[key] = digest
+        _save_digests()
+    return digest
+
+def _digest_text(digest):
+    if "resume" in digest:
+        return digest["resume"]
+    roles = "; ".join(
+        f"{r.get('title','')} at {r.get('company','')} ({r.get('years','?')} yrs)"
+        for r in digest.get("roles", []) if isinstance(r, dict)
+    )
+    return (
+        f"Skills: {', '.join(map(str, digest.get('skills', [])))}\n"
+        f"Roles: {roles}\n"
+        f"Total experience: {digest.get('total_years','?')} years\n"
+        f"Highlights: {'; '.join(map(str, digest.get('highlights', [])))}"
+    )
+
+# Shared system message
+# Every call for a candidate starts with the same system message (instructions, then the
+# digest); only the task specific user message differs. This is a few hundred tokens, below
+# the ~1024-token minimum for OpenAI prompt caching, so it is not served from the cache: the
+# digest trades cache hits for a much smaller prompt than sending the full resume each time.
+INTERVIEWER_INSTRUCTIONS = (
+    "You are an experienced technical interviewer. You generate interview questions tailored to the "
+    "candidate's background, evaluate answers fairly and constructively on a 1-10 scale, and summarize "
+    "interviews with concrete strengths and weaknesses. Always answer with the JSON requested."
+)
+
+def _messages(resume, task_prompt):
+    profile = _digest_text(resume_digest(resume))
+    return [
+        {"role":"system","content":f"{INTERVIEWER_INSTRUCTIONS}\n\nCandidate profile:\n{profile}"},
+        {"role":"user","content":task_prompt},
+    ]
+
+# Model choice, rate limits and sharing of identical in-flight requests are left to llm_backend
+def _chat(stage, messages):
+    completion = complete(stage, messages)
+    tags = usage_tags(completion.usage)
+    logging.info(
+        f"{stage} ({completion.model}): {tags.get('prompt_tokens')} prompt tokens ({tags.get('cached_tokens') or 0} cached), "
+        f"{tags.get('completion_tokens')} completion tokens"
+    )
+    return completion.content
 
 # Generate interview questions
 def generate_questions(resume_text, role, num_questions=5):
     prompt = (
-        f"Generate {num_questions} interview questions for a {role} "
-        f"based on this resume:\n{resume_text}\n"
+        f"Generate {num_questions} interview questions for a {role} based on the candidate profile. "
         "Return a JSON list of questions with fields: text, topic, difficulty."
     )
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}]
-        )
-        content = resp.choices[0].message.content
-        questions = extract_first_json_block(content)
+        questions = extract_first_json_block(_chat("generate_questions", _messages(resume_text, prompt)))
         return questions or []
     except Exception as e:
         return []
@@ -45,40 +150,41 @@ def generate_questions(resume_text, role, num_questions=5):
 # Evaluate candidate answer
 def evaluate_answer(question, answer, resume):
     prompt = (
-        f"Given the resume:\n{resume}\n"
         f"Evaluate the answer to the question:\n{question}\n"
         f"Candidate answer:\n{answer}\n"
         "Return a JSON: {score (1-10), feedback, better_answer}"
     )
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}]
-        )
-        eval_json = extract_first_json_block(resp.choices[0].message.content)
+        eval_json = extract_first_json_block(_chat("evaluate_answer", _messages(resume, prompt)))
         if not isinstance(eval_json, dict):
             return {"score":0,"feedback":"Evaluation failed","better_answer":""}
         return eval_json
     except Exception:
         return {"score":0,"feedback":"Error during evaluation","better_answer":""}
 
-# Summarize interview
-def summarize_interview(questions, answers, resume):
+def _transcript(questions, answers):
     transcript_parts = []
     for q, a in zip(questions, answers):
         transcript_parts.append(f"Q: {q.get('text','')}\nA: {a.get('answer','')}\nScore: {a.get('score',0)}/10")
-    transcript = "\n\n".join(transcript_parts)
+    return "\n\n".join(transcript_parts)
+
+# Summarize interview
+# With running notes covering the first `summarized_turns` answers, only the rest are sent
+def summarize_interview(questions, answers, resume, running_summary=None, summarized_turns=0):
+    if running_summary and summarized_turns:
+        context = (
+            f"Notes on the first {summarized_turns} answers:\n{running_summary}\n"
+            f"Remaining transcript:\n{_transcript(questions[summarized_turns:], answers[summarized_turns:])}\n"
+        )
+    else:
+        context = f"Transcript:\n{_transcript(questions, answers)}\n"
     prompt = (
-        f"Summarize the interview based on resume:\n{resume}\n"
-        f"Transcript:\n{transcript}\n"
+        "Summarize the interview of the candidate profiled above.\n"
+        f"{context}"
         "Return JSON: {overall_score, strengths (list), weaknesses (list), recommendation}"
     )
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}]
-        )
-        summary = extract_first_json_block(resp.choices[0].message.content)
+        summary = extract_first_json_block(_chat("summarize_interview", _messages(resume, prompt)))
         return summary or {}
     except Exception:
         return {}
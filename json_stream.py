@@ -0,0 +1,167 @@
+import json
+
+class IncrementalJSONParser:
+    """
+    Parses a streamed JSON object one chunk at a time, exposing fields as they arrive.
+
+    Only the top-level object is tracked field by field: string values are available
+    while they are still being received, numbers, booleans and nulls as soon as they
+    end, and nested arrays/objects once they close. Every character is looked at once,
+    and partial strings are materialized once per chunk. Text before the opening
+    brace (e.g. a markdown fence) is skipped.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.fields = {}
+        self.complete = False
+        self._started = False
+        self._expect = "key"      # key | colon | value | comma
+        self._in_string = False
+        self._escape = None       # None, "" after a backslash, or the hex digits of a \\u escape
+        self._string = []
+        self._key = None
+        self._scalar = []
+        self._nested = []
+        self._depth = 0
+
+    def feed(self, chunk: str) -> dict:
+        """
+        Consumes the next chunk of the response.
+
+        Args:
+            chunk (str): The newly received text.
+
+        Returns:
+            dict: The fields that changed in this chunk, with their current values.
+        """
+        changed = {}
+        for ch in chunk:
+            if self.complete:
+                break
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                continue
+            if self._depth:
+                self._feed_nested(ch, changed)
+            elif self._in_string:
+                self._feed_string(ch, changed)
+            elif self._scalar:
+                if ch in ",}" or ch.isspace():
+                    self._finish_scalar(changed)
+                    self._after_value(ch)
+                else:
+                    self._scalar.append(ch)
+            else:
+                self._feed_structure(ch, changed)
+        if self._in_string and self._expect == "value" and not self._depth:
+            # Publish the partial string value once per chunk rather than per character
+            text = "".join(self._string)
+            if text and self._is_high_surrogate(text[-1]):
+                # Hold back half a surrogate pair until its second half arrives
+                text = text[:-1]
+            self.fields[self._key] = text
+            changed[self._key] = text
+        return changed
+
+    @staticmethod
+    def _is_high_surrogate(ch: str) -> bool:
+        return "\ud800" <= ch <= "\udbff"
+
+    def _feed_structure(self, ch, changed):
+        if ch.isspace():
+            return
+        if ch == "}":
+            self.complete = True
+        elif self._expect == "key" and ch == '"':
+            self._in_string = True
+        elif self._expect == "colon" and ch == ":":
+            self._expect = "value"
+        elif self._expect == "value":
+            if ch == '"':
+                self._in_string = True
+                self.fields[self._key] = ""
+                changed[self._key] = ""
+            elif ch in "[{":
+                self._depth = 1
+                self._nested = [ch]
+            else:
+                self._scalar = [ch]
+        elif self._expect == "comma" and ch == ",":
+            self._expect = "key"
+
+    def _feed_string(self, ch, changed):
+        if self._escape is not None:
+            if self._escape == "" and ch != "u":
+                self._string.append(self._ESCAPES.get(ch, ch))
+                self._escape = None
+            else:
+                self._escape += ch
+                if len(self._escape) == 5:  # "u" + four hex digits
+                    code = int(self._escape[1:], 16)
+                    if 0xDC00 <= code <= 0xDFFF and self._string and self._is_high_surrogate(self._string[-1]):
+                        # A character outside the BMP (e.g. an emoji) arrives as a surrogate pair
+                        high = ord(self._string.pop())
+                        code = 0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)
+                    self._string.append(chr(code))
+                    self._escape = None
+        elif ch == "\\":
+            self._escape = ""
+        elif ch == '"':
+            self._in_string = False
+            text = "".join(self._string)
+            self._string = []
+            if self._expect == "key":
+                self._key = text
+                self._expect = "colon"
+            else:
+                self.fields[self._key] = text
+                changed[self._key] = text
+                self._expect = "comma"
+            return
+        else:
+            self._string.append(ch)
+
+    def _feed_nested(self, ch, changed):
+        self._nested.append(ch)
+        if self._in_string:
+            if self._escape is not None:
+                self._escape = None
+            elif ch == "\\":
+                self._escape = ""
+            elif ch == '"':
+                self._in_string = False
+            return
+        if ch == '"':
+            self._in_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if not self._depth:
+                try:
+                    value = json.loads("".join(self._nested))
+                except json.JSONDecodeError:
+                    value = None
+                self.fields[self._key] = value
+                changed[self._key] = value
+                self._nested = []
+                self._expect = "comma"
+
+    def _finish_scalar(self, changed):
+        try:
+            value = json.loads("".join(self._scalar))
+        except json.JSONDecodeError:
+            value = "".join(self._scalar)
+        self._scalar = []
+        self.fields[self._key] = value
+        changed[self._key] = value
+
+    def _after_value(self, ch):
+        self._expect = "comma"
+        if ch == "}":
+            self.complete = True
+        elif ch == ",":
+            self._expect = "key"
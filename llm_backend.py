@@ -0,0 +1,413 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from collections import namedtuple
+
+from clients import get_client, get_async_client
+from metrics import span, usage_tags
+from resilience import call, call_async
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Every chat completion goes through this module. It picks the model, waits for the
+# model's rate-limit budget instead of running into HTTP 429s, and lets identical
+# requests that are in flight at the same time share one API call.
+
+# It's crucial to have OPENAI_API_KEY set in your environment
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+# Takes the requests the primary model has no budget left for; empty disables overflow
+LLM_OVERFLOW_MODEL = os.environ.get("LLM_OVERFLOW_MODEL", "")
+
+# The provider's per-minute limits for each model, enforced locally with token buckets
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_OVERFLOW_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_OVERFLOW_REQUESTS_PER_MINUTE", str(LLM_REQUESTS_PER_MINUTE)))
+LLM_OVERFLOW_TOKENS_PER_MINUTE = int(os.environ.get("LLM_OVERFLOW_TOKENS_PER_MINUTE", str(LLM_TOKENS_PER_MINUTE)))
+# Completion tokens reserved per request until its actual usage is known
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.environ.get("LLM_COMPLETION_TOKENS_ESTIMATE", "400"))
+# Longest a request waits for budget; after that it fails and the caller uses its fallback
+LLM_MAX_QUEUE_SECONDS = float(os.environ.get("LLM_MAX_QUEUE_SECONDS", "10"))
+# After a 429 from the provider, no requests are sent to that model for this long
+LLM_RATE_LIMIT_BACKOFF_SECONDS = float(os.environ.get("LLM_RATE_LIMIT_BACKOFF_SECONDS", "5"))
+# Whether identical in-flight requests (same stage, messages and parameters) are coalesced
+LLM_COALESCE = os.environ.get("LLM_COALESCE", "1") == "1"
+
+# The result of a completion: the message content, the model that served it and its token usage
+Completion = namedtuple("Completion", ["content", "model", "usage"])
+
+class RateLimitTimeout(Exception):
+    """Raised when no model had rate-limit budget for a request within LLM_MAX_QUEUE_SECONDS."""
+
+# --- Rate Limits ---
+
+class TokenBucket:
+    """A bucket of per_minute units, refilled continuously. Not thread-safe on its own."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Returns how many seconds until amount is available (0.0 if it is now)."""
+        self._refill()
+        # A request larger than the whole bucket is let through once the bucket is full
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+    def take(self, amount: float):
+        """Removes amount; the level may go negative, delaying later requests."""
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+class ModelLimiter:
+    """Request and token buckets for one model, mirroring the provider's per-minute limits."""
+
+    def __init__(self, model: str, requests_per_minute: int, tokens_per_minute: int):
+        self.model = model
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self.counts = {"granted": 0, "rate_limited": 0}
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Reserves one request and the estimated tokens if both are available now.
+
+        Returns:
+            float: 0.0 if the reservation was made, otherwise the seconds to wait before retrying.
+        """
+        with self._lock:
+            blocked = self.blocked_until - time.monotonic()
+            if blocked > 0:
+                return blocked
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.counts["granted"] += 1
+            return 0.0
+
+    def charge(self, tokens: int):
+        """Books a request sent without waiting for budget, e.g. a hedged duplicate."""
+        with self._lock:
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def settle(self, reserved: int, used: int):
+        """Replaces the reserved token estimate with the actual usage."""
+        with self._lock:
+            if used < reserved:
+                self.tokens.give(reserved - used)
+            else:
+                self.tokens.take(used - reserved)
+
+    def back_off(self, seconds: float = LLM_RATE_LIMIT_BACKOFF_SECONDS):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.counts["rate_limited"] += 1
+        logging.warning(f"Rate limited by the provider on {self.model}; pausing it for {seconds:.0f} s.")
+
+_registry_lock = threading.Lock()
+_limiters = {}
+_counts = {"coalesced": 0, "overflowed": 0, "queued": 0, "queue_timeouts": 0}
+
+def get_limiter(model: str) -> ModelLimiter:
+    """Returns the process-wide limiter of a model."""
+    with _registry_lock:
+        if model not in _limiters:
+            if model == LLM_OVERFLOW_MODEL and model != OPENAI_MODEL:
+                limits = (LLM_OVERFLOW_REQUESTS_PER_MINUTE, LLM_OVERFLOW_TOKENS_PER_MINUTE)
+            else:
+                limits = (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+            _limiters[model] = ModelLimiter(model, *limits)
+        return _limiters[model]
+
+def _count(name: str):
+    with _registry_lock:
+        _counts[name] += 1
+
+def estimate_tokens(messages: list) -> int:
+    """A rough token count of a request: about four characters per prompt token, plus the expected completion."""
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return prompt_chars // 4 + LLM_COMPLETION_TOKENS_ESTIMATE
+
+def _route(tokens: int, overflow: bool) -> tuple:
+    """Returns (model, 0.0) with budget reserved on that model, or (None, seconds to wait)."""
+    wait = get_limiter(OPENAI_MODEL).try_acquire(tokens)
+    if not wait:
+        return OPENAI_MODEL, 0.0
+    if overflow and LLM_OVERFLOW_MODEL and LLM_OVERFLOW_MODEL != OPENAI_MODEL:
+        overflow_wait = get_limiter(LLM_OVERFLOW_MODEL).try_acquire(tokens)
+        if not overflow_wait:
+            _count("overflowed")
+            return LLM_OVERFLOW_MODEL, 0.0
+        wait = min(wait, overflow_wait)
+    return None, wait
+
+def acquire(tokens: int, overflow: bool = True) -> str:
+    """
+    Waits until a model has budget for a request and reserves it.
+
+    Args:
+        tokens (int): The estimated tokens of the request (see estimate_tokens).
+        overflow (bool): Whether the request may go to LLM_OVERFLOW_MODEL when the primary
+            model has no budget left.
+
+    Returns:
+        str: The model to send the request to.
+
+    Raises:
+        RateLimitTimeout: No budget became available within LLM_MAX_QUEUE_SECONDS.
+    """
+    deadline = time.monotonic() + LLM_MAX_QUEUE_SECONDS
+    model, wait = _route(tokens, overflow)
+    if model is None:
+        _count("queued")
+    while model is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _count("queue_timeouts")
+            raise RateLimitTimeout(f"No rate-limit budget within {LLM_MAX_QUEUE_SECONDS:g} s.")
+        time.sleep(min(wait, remaining))
+        model, wait = _route(tokens, overflow)
+    return model
+
+async def acquire_async(tokens: int, overflow: bool = True) -> str:
+    """Asyncio variant of acquire; waiting does not block the event loop."""
+    deadline = time.monotonic() + LLM_MAX_QUEUE_SECONDS
+    model, wait = _route(tokens, overflow)
+    if model is None:
+        _count("queued")
+    while model is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _count("queue_timeouts")
+            raise RateLimitTimeout(f"No rate-limit budget within {LLM_MAX_QUEUE_SECONDS:g} s.")
+        await asyncio.sleep(min(wait, remaining))
+        model, wait = _route(tokens, overflow)
+    return model
+
+def _is_rate_limited(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+# --- Completions ---
+
+def _request_key(stage: str, messages: list, params: dict, overflow: bool) -> str:
+    payload = json.dumps([stage, messages, params, overflow], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _settle(model: str, reserved: int, usage):
+    used = getattr(usage, "total_tokens", None)
+    if isinstance(used, int):
+        get_limiter(model).settle(reserved, used)
+
+def _complete(stage: str, messages: list, params: dict, hedge: bool, overflow: bool, tags: dict) -> Completion:
+    client = get_client()
+    if not client:
+        raise RuntimeError("OpenAI client not initialized.")
+    tokens = estimate_tokens(messages)
+    with span(stage, model=OPENAI_MODEL, **tags) as stage_span:
+        queued = time.perf_counter()
+        model = acquire(tokens, overflow)
+        stage_span.set(model=model, queue_wait=round(time.perf_counter() - queued, 3))
+        attempts = []
+
+        def make_call(timeout):
+            # The first attempt was reserved above; a hedged duplicate is booked as it is sent
+            if attempts:
+                get_limiter(model).charge(tokens)
+            attempts.append(timeout)
+            return client.chat.completions.create(model=model, messages=messages, timeout=timeout, **params)
+
+        try:
+            response = call(stage, make_call, hedge=hedge)
+        except Exception as e:
+            if _is_rate_limited(e):
+                get_limiter(model).back_off()
+            raise
+        _settle(model, tokens, response.usage)
+        stage_span.set(**usage_tags(response.usage))
+    return Completion(response.choices[0].message.content, model, response.usage)
+
+async def _complete_async(stage: str, messages: list, params: dict, hedge: bool, overflow: bool, tags: dict) -> Completion:
+    aclient = get_async_client()
+    if not aclient:
+        raise RuntimeError("Async OpenAI client not initialized.")
+    tokens = estimate_tokens(messages)
+    with span(stage, model=OPENAI_MODEL, **tags) as stage_span:
+        queued = time.perf_counter()
+        model = await acquire_async(tokens, overflow)
+        stage_span.set(model=model, queue_wait=round(time.perf_counter() - queued, 3))
+        attempts = []
+
+        def make_call(timeout):
+            if attempts:
+                get_limiter(model).charge(tokens)
+            attempts.append(timeout)
+            return aclient.chat.completions.create(model=model, messages=messages, timeout=timeout, **params)
+
+        try:
+            response = await call_async(stage, make_call, hedge=hedge)
+        except Exception as e:
+            if _is_rate_limited(e):
+                get_limiter(model).back_off()
+            raise
+        _settle(model, tokens, response.usage)
+        stage_span.set(**usage_tags(response.usage))
+    return Completion(response.choices[0].message.content, model, response.usage)
+
+# In-flight requests by key; later identical requests wait for the first one's result
+_inflight_lock = threading.Lock()
+_inflight = {}
+_inflight_async = {}
+
+def complete(stage: str, messages: list, hedge: bool = True, overflow: bool = True, tags: dict = None, **params) -> Completion:
+    """
+    Sends a chat completion request, scheduled against the model's rate limits.
+
+    Args:
+        stage (str): The pipeline stage, e.g. "evaluate_answer" (names the span, deadline and hedging policy).
+        messages (list): The chat messages.
+        hedge (bool): Whether a duplicate request may be sent when the call is slow.
+        overflow (bool): Whether the request may be served by LLM_OVERFLOW_MODEL.
+        tags (dict): Extra span tags, e.g. the number of answers in the request.
+        **params: Further request parameters such as temperature or response_format.
+
+    Returns:
+        Completion: The content, the model that served it and the token usage.
+
+    Raises:
+        RateLimitTimeout: No model had budget in time; nothing was sent.
+        Any error of the call itself (see resilience.call).
+    """
+    tags = tags or {}
+    if not LLM_COALESCE:
+        return _complete(stage, messages, params, hedge, overflow, tags)
+    key = _request_key(stage, messages, params, overflow)
+    with _inflight_lock:
+        shared = _inflight.get(key)
+        if shared is None:
+            future = _inflight[key] = concurrent.futures.Future()
+    if shared is not None:
+        _count("coalesced")
+        return shared.result()
+    try:
+        result = _complete(stage, messages, params, hedge, overflow, tags)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def _forget_inflight(key, task):
+    if _inflight_async.get(key) is task:
+        del _inflight_async[key]
+    # Marks the error as retrieved when every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+async def complete_async(stage: str, messages: list, hedge: bool = True, overflow: bool = True,
+                         tags: dict = None, **params) -> Completion:
+    """Asyncio variant of complete. A caller that is cancelled does not cancel a shared request."""
+    tags = tags or {}
+    if not LLM_COALESCE:
+        return await _complete_async(stage, messages, params, hedge, overflow, tags)
+    # Tasks belong to their event loop, so only requests on the same loop are coalesced
+    key = (asyncio.get_running_loop(), _request_key(stage, messages, params, overflow))
+    task = _inflight_async.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_complete_async(stage, messages, params, hedge, overflow, tags))
+        _inflight_async[key] = task
+        task.add_done_callback(lambda t: _forget_inflight(key, t))
+    else:
+        _count("coalesced")
+    return await asyncio.shield(task)
+
+async def stream_async(stage_span, stage: str, messages: list, overflow: bool = True, **params):
+    """
+    Streams a chat completion, scheduled like complete_async. Streams are neither hedged nor coalesced.
+
+    Args:
+        stage_span (Span): The caller's span for the stage; the model, queue wait and token
+            usage are added to it.
+        stage (str): The pipeline stage; its resilience policy is "<stage>_stream".
+        messages (list): The chat messages.
+        overflow (bool): Whether the request may be served by LLM_OVERFLOW_MODEL.
+        **params: Further request parameters such as temperature or response_format.
+
+    Yields:
+        str: The content deltas as they arrive.
+    """
+    aclient = get_async_client()
+    if not aclient:
+        raise RuntimeError("Async OpenAI client not initialized.")
+    tokens = estimate_tokens(messages)
+    queued = time.perf_counter()
+    model = await acquire_async(tokens, overflow)
+    stage_span.set(model=model, queue_wait=round(time.perf_counter() - queued, 3))
+    # The deadline bounds connecting and each wait between chunks
+    try:
+        stream = await call_async(f"{stage}_stream", lambda timeout: aclient.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            # The final chunk then carries token usage
+            stream_options={"include_usage": True},
+            timeout=timeout,
+            **params
+        ), hedge=False)
+    except Exception as e:
+        if _is_rate_limited(e):
+            get_limiter(model).back_off()
+        raise
+    async for chunk in stream:
+        if getattr(chunk, "usage", None):
+            _settle(model, tokens, chunk.usage)
+            stage_span.set(**usage_tags(chunk.usage))
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def render_prometheus() -> str:
+    """Renders per-model budget levels and request counts, and the scheduler's counters."""
+    with _registry_lock:
+        limiters = dict(_limiters)
+        counts = dict(_counts)
+    lines = ["# TYPE interview_llm_budget_remaining gauge"]
+    for model, limiter in sorted(limiters.items()):
+        with limiter._lock:
+            limiter.requests.wait_time(0)
+            limiter.tokens.wait_time(0)
+            levels = {"requests": limiter.requests.level, "tokens": limiter.tokens.level}
+        for kind, level in levels.items():
+            lines.append(f'interview_llm_budget_remaining{{model="{model}",kind="{kind}"}} {level:.0f}')
+    lines.append("# TYPE interview_llm_requests_total counter")
+    for model, limiter in sorted(limiters.items()):
+        for outcome, value in limiter.counts.items():
+            lines.append(f'interview_llm_requests_total{{model="{model}",outcome="{outcome}"}} {value}')
+    lines.append("# TYPE interview_llm_scheduler_total counter")
+    for name, value in counts.items():
+        lines.append(f'interview_llm_scheduler_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
@@ -1,26 +1,57 @@
 import os
 import json
-from openai import OpenAI
+import time
+import asyncio
 import logging
 
+from clients import get_client, get_async_client
+from json_stream import IncrementalJSONParser
+from llm_backend import complete, complete_async, stream_async, OPENAI_MODEL
+from memo_cache import get_memo_cache, content_key, normalize_text
+from metrics import span
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Load environment variables from .env file for local development
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    logging.warning("dotenv package not found. Make sure to set environment variables manually.")
-
-# Initialize OpenAI client
-# It's crucial to have OPENAI_API_KEY set in your environment
-try:
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-    OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
-except Exception as e:
-    logging.error(f"Failed to initialize OpenAI client: {e}")
-    client = None
+# Requests go through llm_backend.py, which chooses the model (OPENAI_MODEL, or the
+# overflow model when it is out of rate-limit budget) and uses the shared clients
+
+# Stream evaluations and summaries token by token to the UI
+LLM_STREAMING = os.environ.get("LLM_STREAMING", "0") == "1"
+
+# Answers that are clearly not substantive are scored locally instead of by the LLM
+PRESCORE_ENABLED = os.environ.get("PRESCORE_ENABLED", "1") == "1"
+# Fewer words than this is too short to evaluate
+PRESCORE_MIN_WORDS = int(os.environ.get("PRESCORE_MIN_WORDS", "8"))
+# Less detected speech than this (in seconds) is treated as no answer, whatever the
+# transcript says; Whisper tends to invent short phrases for near-silent recordings
+PRESCORE_MIN_SPEECH_SECONDS = float(os.environ.get("PRESCORE_MIN_SPEECH_SECONDS", "1.5"))
+
+# Placeholder the app stores when transcription fails
+UNTRANSCRIBED_ANSWER = "(Audio could not be transcribed)"
+
+# Feedback and summary texts of the fallbacks returned when a call cannot be made or fails
+EVALUATION_UNAVAILABLE = "Evaluation could not be performed."
+EVALUATION_ERROR = "An error occurred during evaluation."
+SUMMARY_UNAVAILABLE = "Could not generate a summary."
+SUMMARY_MISSING = "Summary could not be generated."
+SUMMARY_ERROR = "An error occurred while generating the final summary."
+
+def is_fallback(result: dict) -> bool:
+    """Whether an evaluation or summary is a fallback, i.e. worth retrying rather than storing."""
+    return (result.get("feedback") in (EVALUATION_UNAVAILABLE, EVALUATION_ERROR)
+            or result.get("summary") in (SUMMARY_UNAVAILABLE, SUMMARY_MISSING, SUMMARY_ERROR))
+
+# "per_turn" evaluates each answer as it is submitted; "deferred" only transcribes during
+# the interview and scores every answer (plus the summary) in batched calls at the end
+EVALUATION_MODE = os.environ.get("EVALUATION_MODE", "per_turn")
+# Most answers scored in one batched call; longer interviews are split into several calls
+BATCH_EVALUATION_SIZE = int(os.environ.get("BATCH_EVALUATION_SIZE", "8"))
+
+# Fold each evaluated answer into compact running notes in the background, so the final
+# summary call only has to merge the last turn instead of the whole transcript
+RUNNING_SUMMARY = os.environ.get("RUNNING_SUMMARY", "1") == "1"
+RUNNING_SUMMARY_MAX_WORDS = int(os.environ.get("RUNNING_SUMMARY_MAX_WORDS", "150"))
 
 def extract_json_from_string(s: str):
     """
@@ -38,23 +69,12 @@ def extract_json_from_string(s: str):
         return None
     return None
 
-def generate_questions(role: str, num_questions: int = 5) -> list:
-    """
-    Generates a list of interview questions for a given role using an LLM.
-
-    Args:
-        role (str): The job role for which to generate questions.
-        num_questions (int): The number of questions to generate.
+# --- Prompt Construction and Response Parsing ---
+# Shared by the blocking and the asyncio variants below so both always send
+# identical prompts and interpret the responses the same way.
 
-    Returns:
-        list: A list of dictionaries, where each dictionary is a question.
-              Returns a static list from questions.json on failure.
-    """
-    if not client:
-        logging.error("OpenAI client not initialized. Falling back to static questions.")
-        return load_static_questions()
-
-    prompt = f"""
+def _questions_prompt(role: str, num_questions: int) -> str:
+    return f"""
     You are an expert HR interviewer. Generate {num_questions} diverse interview questions for a candidate applying for the role of '{role}'.
     The questions should cover a range of topics, including technical skills, behavioral aspects, problem-solving abilities, and cultural fit.
     Return the output as a clean JSON array of objects, where each object has a single key "text" containing the question.
@@ -66,47 +86,27 @@ def generate_questions(role: str, num_questions: int = 5) -> list:
     ]
     """
 
-    try:
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            response_format={"type": "json_object"} # Use JSON mode if available
-        )
-        content = response.choices[0].message.content
-        # The content should already be a JSON object, but we handle cases where it might be wrapped.
-        questions_data = json.loads(content)
-        # The prompt asks for an array, but the model might return a dictionary with a key.
-        # We need to find the list of questions within the returned object.
-        if isinstance(questions_data, dict):
-            for key, value in questions_data.items():
-                if isinstance(value, list):
-                    return value # Return the first list found
-        elif isinstance(questions_data, list):
-             return questions_data
-
-        logging.error("LLM returned unexpected JSON structure. Falling back to static questions.")
-        return load_static_questions()
-
-    except Exception as e:
-        logging.error(f"Error generating questions with LLM: {e}")
-        return load_static_questions()
-
-def evaluate_answer(question: str, answer: str) -> dict:
-    """
-    Evaluates a candidate's answer to a question using an LLM.
+def _parse_questions(content: str) -> list:
+    # The content should already be a JSON object, but we handle cases where it might be wrapped.
+    questions_data = json.loads(content)
+    # The prompt asks for an array, but the model might return a dictionary with a key.
+    # We need to find the list of questions within the returned object.
+    if isinstance(questions_data, dict):
+        for key, value in questions_data.items():
+            if isinstance(value, list):
+                return value # Return the first list found
+    elif isinstance(questions_data, list):
+         return questions_data
 
-    Args:
-        question (str): The interview question that was asked.
-        answer (str): The candidate's transcribed answer.
+    logging.error("LLM returned unexpected JSON structure.")
+    return None
 
-    Returns:
-        dict: A dictionary containing the score, feedback, and a suggested better answer.
-    """
-    if not client or not answer:
-        return {"score": 0, "feedback": "Evaluation could not be performed.", "better_answer": "N/A"}
+# Part of the memo cache key of evaluations; bump it whenever _evaluation_prompt changes so
+# evaluations made with the old prompt are not reused
+EVALUATION_PROMPT_VERSION = 1
 
-    prompt = f"""
+def _evaluation_prompt(question: str, answer: str) -> str:
+    return f"""
     As an expert interviewer, evaluate the following answer to an interview question.
     Provide a constructive, encouraging, and brief feedback.
     Also, provide a score from 0 to 10, where 0 is very poor and 10 is excellent.
@@ -123,70 +123,602 @@ def evaluate_answer(question: str, answer: str) -> dict:
         "better_answer": "In my previous role, I led a project that increased user engagement by 15% in one quarter by implementing a new recommendation algorithm."
     }}
     """
+
+def validate_evaluation(item) -> dict:
+    """
+    Checks an evaluation against the score/feedback/better_answer schema.
+
+    Returns:
+        dict: The evaluation with exactly those three keys, or None if it is invalid.
+    """
+    if not isinstance(item, dict):
+        return None
+    score = item.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 10:
+        return None
+    if not isinstance(item.get("feedback"), str) or not item["feedback"].strip():
+        return None
+    if not isinstance(item.get("better_answer"), str):
+        return None
+    return {"score": score, "feedback": item["feedback"], "better_answer": item["better_answer"]}
+
+def _batch_evaluation_prompt(items: list, with_summary: bool) -> str:
+    answers = "\n\n".join(
+        f"[Answer {index}]\nQuestion: \"{e['question']}\"\nCandidate's Answer: \"{e['answer']}\""
+        for index, e in items
+    )
+    summary_instructions = """
+    Then, based on all of the answers, write a brief overall summary of the candidate's performance.
+    Highlight one key strength and one area for improvement. Keep the tone professional and constructive.
+    Do not mention any scores in the summary.
+    """ if with_summary else ""
+    summary_key = ' and a "summary" string' if with_summary else ""
+
+    return f"""
+    As an expert interviewer, evaluate each of the following answers to interview questions.
+    For each answer, provide constructive, encouraging, and brief feedback, a score from 0 to 10
+    (0 is very poor and 10 is excellent), and an improved, concise version of the answer that would be considered ideal.
+    {summary_instructions}
+    {answers}
+
+    Return a JSON object with an "evaluations" array{summary_key}. The array has one object per answer, in the
+    order given, each with the keys "index" (the answer number), "score", "feedback", and "better_answer".
+    """
+
+def _batch_response_format(with_summary: bool) -> dict:
+    evaluation = {
+        "type": "object",
+        "properties": {
+            "index": {"type": "integer"},
+            "score": {"type": "number"},
+            "feedback": {"type": "string"},
+            "better_answer": {"type": "string"},
+        },
+        "required": ["index", "score", "feedback", "better_answer"],
+        "additionalProperties": False,
+    }
+    properties = {"evaluations": {"type": "array", "items": evaluation}}
+    if with_summary:
+        properties["summary"] = {"type": "string"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "interview_evaluation",
+            "strict": True,
+            "schema": {"type": "object", "properties": properties, "required": list(properties),
+                       "additionalProperties": False},
+        },
+    }
+
+def _numeric_score(score) -> float:
+    # The LLM occasionally returns scores as strings ("7") or null
+    if isinstance(score, bool):
+        return None
+    if isinstance(score, str):
+        try:
+            score = float(score.strip())
+        except ValueError:
+            return None
+    if not isinstance(score, (int, float)) or not 0 <= score <= 10:
+        return None
+    return score
+
+def average_score(evaluations: list) -> float:
+    """The interview's (running) score: the mean of the valid scores so far (missing or malformed ones are skipped)."""
+    scores = [s for s in (_numeric_score(e.get('score')) for e in evaluations) if s is not None]
+    return round(sum(scores) / len(scores), 1) if scores else 0
+
+def _transcript(evaluations: list, first_turn: int = 0) -> str:
+    return "\n\n".join(
+        f"Question {first_turn+i+1}: {e['question']}\nAnswer: {e['answer']}\nFeedback: {e['feedback']} (Score: {e['score']})"
+        for i, e in enumerate(evaluations)
+    )
+
+def _summary_prompt(evaluations: list, running_summary: str = None, summarized_turns: int = 0) -> str:
+    # With a running summary, only the turns it does not cover yet are sent
+    if running_summary and summarized_turns:
+        context = f"""Notes on questions 1 to {summarized_turns}:
+    {running_summary}
+
+    Remaining transcript:
+    {_transcript(evaluations[summarized_turns:], summarized_turns) or "(none)"}"""
+    else:
+        context = f"""Transcript:
+    {_transcript(evaluations)}"""
+
+    return f"""
+    Based on the following interview notes, transcript and evaluations, provide a brief, overall summary of the candidate's performance.
+    Highlight one key strength and one area for improvement. Keep the tone professional and constructive.
+    Do not mention the final score in your summary text.
+
+    {context}
+
+    Return a single JSON object with the key "summary".
+    """
+
+def _running_summary_prompt(running_summary: str, new_evaluations: list, first_turn: int) -> str:
+    return f"""
+    You are keeping concise running notes on a job interview in progress. Update the notes with the new
+    answers below, keeping what matters for a final assessment: demonstrated strengths, weaknesses, and notable examples.
+    Keep the notes under {RUNNING_SUMMARY_MAX_WORDS} words.
+
+    Current notes:
+    {running_summary or "(none yet)"}
+
+    New answers:
+    {_transcript(new_evaluations, first_turn)}
+
+    Return a single JSON object with the key "notes".
+    """
+
+# --- Local Pre-scoring ---
+# A cheap, deterministic first tier in front of the LLM: missing, inaudible and very short
+# answers get a fixed score and feedback instantly. Whether an answer is on topic is left
+# to the LLM; keyword overlap misjudges too many genuine answers.
+
+_FAST_PATH_EVALUATIONS = {
+    "no_answer": {
+        "score": 0,
+        "feedback": "We couldn't hear an answer to this question. Check that your microphone is working and speak clearly.",
+        "better_answer": "N/A",
+    },
+    "too_short": {
+        "score": 1,
+        "feedback": "Your answer was very brief. Take your time and give a complete answer with a concrete example.",
+        "better_answer": "A strong answer addresses the question directly, then backs it up with a specific example: the situation, what you did, and the result.",
+    },
+}
+
+def answer_features(question: str, answer: str, speech_seconds: float = None) -> dict:
+    """Returns the features the pre-scorer looks at: word count and speech duration."""
+    answer = "" if answer == UNTRANSCRIBED_ANSWER else (answer or "")
+    return {
+        "words": len(answer.split()),
+        "speech_seconds": speech_seconds,
+    }
+
+def _fast_path_reason(features: dict) -> str:
+    if features["words"] == 0:
+        return "no_answer"
+    if features["speech_seconds"] is not None and features["speech_seconds"] < PRESCORE_MIN_SPEECH_SECONDS:
+        return "no_answer"
+    if features["words"] < PRESCORE_MIN_WORDS:
+        return "too_short"
+    return None
+
+def prescore_answer(question: str, answer: str, speech_seconds: float = None) -> dict:
+    """
+    Scores an answer locally when it is clearly not substantive.
+
+    Args:
+        question (str): The interview question that was asked.
+        answer (str): The candidate's transcribed answer.
+        speech_seconds (float): Seconds of detected speech in the recording, if known.
+
+    Returns:
+        dict: A deterministic evaluation (score, feedback, better_answer), or None if the
+              answer should go to the LLM.
+    """
+    if not PRESCORE_ENABLED:
+        return None
+    with span("prescore_answer") as stage:
+        features = answer_features(question, answer, speech_seconds)
+        reason = _fast_path_reason(features)
+        stage.set(fast_path=reason is not None, reason=reason, words=features["words"])
+    if reason is None:
+        return None
+    logging.info(f"Answer scored locally ({reason}, {features['words']} word(s)).")
+    return dict(_FAST_PATH_EVALUATIONS[reason])
+
+# --- Memoized Evaluations ---
+# LLM evaluations are memoized by model, prompt version, question and normalized answer,
+# so a resubmitted or re-scored answer costs no second call. use_cache=False skips the
+# lookup for an intentional re-evaluation; the fresh result still replaces the old one.
+# Both helpers touch SQLite, so the asyncio variants call them via asyncio.to_thread.
+
+def _cached_evaluation(question: str, answer: str, use_cache: bool) -> tuple:
+    """Returns (memo key, cached evaluation or None); the key is None without a memo cache."""
+    cache = get_memo_cache()
+    if not cache:
+        return None, None
+    key = content_key(OPENAI_MODEL, EVALUATION_PROMPT_VERSION, question, normalize_text(answer))
+    if not use_cache:
+        cache.record_bypass("evaluate_answer")
+        return key, None
+    return key, cache.get("evaluate_answer", key)
+
+def _store_evaluation(key: str, evaluation: dict, model: str):
+    # Only well-formed evaluations by OPENAI_MODEL are memoized, never fallbacks, malformed
+    # output or evaluations the overflow model served
+    cache = get_memo_cache()
+    if cache and key and model == OPENAI_MODEL and validate_evaluation(evaluation):
+        cache.put("evaluate_answer", key, evaluation)
+
+# --- Blocking API ---
+
+def generate_questions(role: str, num_questions: int = 5, fallback: bool = True) -> list:
+    """
+    Generates a list of interview questions for a given role using an LLM.
+
+    Args:
+        role (str): The job role for which to generate questions.
+        num_questions (int): The number of questions to generate.
+        fallback (bool): Whether to fall back to the static questions on failure.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary is a question.
+              Returns a static list from questions.json on failure, or an
+              empty list if fallback is False.
+    """
+    if not get_client():
+        logging.error("OpenAI client not initialized. Falling back to static questions.")
+        return load_static_questions() if fallback else []
+
     try:
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+        completion = complete(
+            "generate_questions",
+            [{"role": "user", "content": _questions_prompt(role, num_questions)}],
+            temperature=0.7,
+            response_format={"type": "json_object"}, # Use JSON mode if available
+        )
+        questions = _parse_questions(completion.content)
+        if questions:
+            return questions
+
+    except Exception as e:
+        logging.error(f"Error generating questions with LLM: {e}")
+    return load_static_questions() if fallback else []
+
+def evaluate_answer(question: str, answer: str, speech_seconds: float = None, use_cache: bool = True) -> dict:
+    """
+    Evaluates a candidate's answer to a question, using the LLM only for substantive answers.
+
+    Args:
+        question (str): The interview question that was asked.
+        answer (str): The candidate's transcribed answer.
+        speech_seconds (float): Seconds of detected speech in the recording, if known.
+        use_cache (bool): Whether a memoized evaluation of the same answer may be returned.
+
+    Returns:
+        dict: A dictionary containing the score, feedback, and a suggested better answer.
+    """
+    prescored = prescore_answer(question, answer, speech_seconds)
+    if prescored:
+        return prescored
+    memo_key, cached = _cached_evaluation(question, answer, use_cache)
+    if cached:
+        return cached
+    if not get_client() or not answer:
+        return {"score": 0, "feedback": EVALUATION_UNAVAILABLE, "better_answer": "N/A"}
+
+    try:
+        completion = complete(
+            "evaluate_answer",
+            [{"role": "user", "content": _evaluation_prompt(question, answer)}],
             temperature=0.5,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
         )
-        content = response.choices[0].message.content
-        evaluation = json.loads(content)
-        return evaluation
+        evaluation = json.loads(completion.content)
     except Exception as e:
         logging.error(f"Error evaluating answer with LLM: {e}")
-        return {"score": 0, "feedback": "An error occurred during evaluation.", "better_answer": "Could not be generated."}
+        return {"score": 0, "feedback": EVALUATION_ERROR, "better_answer": "Could not be generated."}
 
+    # Stored outside the try so a memo cache failure never discards the evaluation
+    _store_evaluation(memo_key, evaluation, completion.model)
+    return evaluation
 
-def get_interview_summary(evaluations: list) -> dict:
+
+def get_interview_summary(evaluations: list, running_summary: str = None, summarized_turns: int = 0) -> dict:
     """
     Generates a final summary of the interview based on all evaluations.
 
     Args:
         evaluations (list): A list of evaluation dictionaries for each answer.
+        running_summary (str): Running notes covering the first summarized_turns answers, if any;
+            only the answers after those are then sent.
+        summarized_turns (int): The number of answers the running notes cover.
 
     Returns:
         dict: A dictionary containing the final score and a summary paragraph.
     """
-    if not client or not evaluations:
-        return {"final_score": 0, "summary": "Could not generate a summary."}
+    if not get_client() or not evaluations:
+        return {"final_score": 0, "summary": SUMMARY_UNAVAILABLE}
 
-    # Calculate average score
-    total_score = sum(e.get('score', 0) for e in evaluations)
-    num_questions = len(evaluations)
-    final_score = round(total_score / num_questions, 1) if num_questions > 0 else 0
+    final_score = average_score(evaluations)
 
-    # Prepare context for summary generation
-    transcript = "\n\n".join(
-        f"Question {i+1}: {e['question']}\nAnswer: {e['answer']}\nFeedback: {e['feedback']} (Score: {e['score']})"
-        for i, e in enumerate(evaluations)
-    )
+    try:
+        completion = complete(
+            "get_interview_summary",
+            [{"role": "user", "content": _summary_prompt(evaluations, running_summary, summarized_turns)}],
+            temperature=0.6,
+            response_format={"type": "json_object"},
+        )
+        summary_data = json.loads(completion.content)
+        return {"final_score": final_score, "summary": summary_data.get("summary", SUMMARY_MISSING)}
 
-    prompt = f"""
-    Based on the following interview transcript and evaluations, provide a brief, overall summary of the candidate's performance.
-    Highlight one key strength and one area for improvement. Keep the tone professional and constructive.
-    Do not mention the final score in your summary text.
+    except Exception as e:
+        logging.error(f"Error generating summary with LLM: {e}")
+        return {"final_score": final_score, "summary": SUMMARY_ERROR}
 
-    Transcript:
-    {transcript}
+# --- Asyncio API ---
+# Same contracts as the blocking functions above, but backed by the shared pooled
+# AsyncOpenAI client so many interviews can wait on the LLM concurrently.
 
-    Return a single JSON object with the key "summary".
-    """
+async def generate_questions_async(role: str, num_questions: int = 5, fallback: bool = True) -> list:
+    """Asyncio variant of generate_questions."""
+    if not get_async_client():
+        logging.error("Async OpenAI client not initialized. Falling back to static questions.")
+        return load_static_questions() if fallback else []
 
     try:
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+        completion = await complete_async(
+            "generate_questions",
+            [{"role": "user", "content": _questions_prompt(role, num_questions)}],
+            temperature=0.7,
+            response_format={"type": "json_object"},
+        )
+        questions = _parse_questions(completion.content)
+        if questions:
+            return questions
+
+    except Exception as e:
+        logging.error(f"Error generating questions with LLM: {e}")
+    return load_static_questions() if fallback else []
+
+async def evaluate_answer_async(question: str, answer: str, speech_seconds: float = None, use_cache: bool = True) -> dict:
+    """Asyncio variant of evaluate_answer."""
+    prescored = prescore_answer(question, answer, speech_seconds)
+    if prescored:
+        return prescored
+    memo_key, cached = await asyncio.to_thread(_cached_evaluation, question, answer, use_cache)
+    if cached:
+        return cached
+    if not get_async_client() or not answer:
+        return {"score": 0, "feedback": EVALUATION_UNAVAILABLE, "better_answer": "N/A"}
+
+    try:
+        completion = await complete_async(
+            "evaluate_answer",
+            [{"role": "user", "content": _evaluation_prompt(question, answer)}],
+            temperature=0.5,
+            response_format={"type": "json_object"},
+        )
+        evaluation = json.loads(completion.content)
+    except Exception as e:
+        logging.error(f"Error evaluating answer with LLM: {e}")
+        return {"score": 0, "feedback": EVALUATION_ERROR, "better_answer": "Could not be generated."}
+
+    # Stored outside the try so a memo cache failure never discards the evaluation
+    await asyncio.to_thread(_store_evaluation, memo_key, evaluation, completion.model)
+    return evaluation
+
+async def get_interview_summary_async(evaluations: list, running_summary: str = None, summarized_turns: int = 0) -> dict:
+    """Asyncio variant of get_interview_summary."""
+    if not get_async_client() or not evaluations:
+        return {"final_score": 0, "summary": SUMMARY_UNAVAILABLE}
+
+    final_score = average_score(evaluations)
+
+    try:
+        completion = await complete_async(
+            "get_interview_summary",
+            [{"role": "user", "content": _summary_prompt(evaluations, running_summary, summarized_turns)}],
             temperature=0.6,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+        )
+        summary_data = json.loads(completion.content)
+        return {"final_score": final_score, "summary": summary_data.get("summary", SUMMARY_MISSING)}
+
+    except Exception as e:
+        logging.error(f"Error generating summary with LLM: {e}")
+        return {"final_score": final_score, "summary": SUMMARY_ERROR}
+
+# --- Running Summary ---
+
+def _parse_notes(content: str) -> str:
+    notes = json.loads(content).get("notes")
+    return notes if isinstance(notes, str) and notes.strip() else None
+
+def update_running_summary(running_summary: str, new_evaluations: list, first_turn: int) -> str:
+    """
+    Folds newly evaluated answers into the interview's running notes.
+
+    Args:
+        running_summary (str): The notes so far (empty before the first update).
+        new_evaluations (list): The evaluated answers the notes do not cover yet.
+        first_turn (int): The index of the first of those answers in the interview.
+
+    Returns:
+        str: The updated notes, or None on failure (the caller keeps the old notes and
+             includes these answers in its next update).
+    """
+    if not get_client():
+        return None
+    try:
+        completion = complete(
+            "update_running_summary",
+            [{"role": "user", "content": _running_summary_prompt(running_summary, new_evaluations, first_turn)}],
+            tags={"answers": len(new_evaluations)},
+            temperature=0.3,
+            response_format={"type": "json_object"},
+        )
+        return _parse_notes(completion.content)
+    except Exception as e:
+        logging.error(f"Error updating running summary with LLM: {e}")
+        return None
+
+async def update_running_summary_async(running_summary: str, new_evaluations: list, first_turn: int) -> str:
+    """Asyncio variant of update_running_summary."""
+    if not get_async_client():
+        return None
+    try:
+        completion = await complete_async(
+            "update_running_summary",
+            [{"role": "user", "content": _running_summary_prompt(running_summary, new_evaluations, first_turn)}],
+            tags={"answers": len(new_evaluations)},
+            temperature=0.3,
+            response_format={"type": "json_object"},
         )
-        content = response.choices[0].message.content
-        summary_data = json.loads(content)
-        return {"final_score": final_score, "summary": summary_data.get("summary", "Summary could not be generated.")}
+        return _parse_notes(completion.content)
+    except Exception as e:
+        logging.error(f"Error updating running summary with LLM: {e}")
+        return None
+
+# --- Batched Evaluation ---
+# Used by the deferred evaluation mode: answers are collected without evaluation during
+# the interview and scored together at the end, so each question and answer is sent once
+# and the summary comes from the same call.
+
+async def _evaluate_batch_async(results: list, indices: list, with_summary: bool) -> str:
+    """Scores results[i] for each index in place and returns the summary, if requested and valid."""
+    if not get_async_client():
+        return None
+    # Answers are numbered from 1 in the prompt
+    items = [(n + 1, results[i]) for n, i in enumerate(indices)]
+    try:
+        completion = await complete_async(
+            "evaluate_batch",
+            [{"role": "user", "content": _batch_evaluation_prompt(items, with_summary)}],
+            hedge=False,
+            tags={"answers": len(indices)},
+            temperature=0.5,
+            response_format=_batch_response_format(with_summary),
+        )
+        data = json.loads(completion.content)
+    except Exception as e:
+        logging.error(f"Error evaluating answer batch with LLM: {e}")
+        return None
+
+    for item in data.get("evaluations", []) if isinstance(data, dict) else []:
+        number = item.get("index") if isinstance(item, dict) else None
+        evaluation = validate_evaluation(item)
+        if evaluation is None or not isinstance(number, int) or not 1 <= number <= len(indices):
+            logging.warning(f"Discarding invalid batched evaluation: {item}")
+            continue
+        target = results[indices[number - 1]]
+        target.pop("pending", None)
+        target.update(evaluation)
+    summary = data.get("summary") if isinstance(data, dict) else None
+    return summary if isinstance(summary, str) and summary.strip() else None
+
+async def evaluate_interview_async(evaluations: list) -> dict:
+    """
+    Scores every pending answer of an interview and writes the summary, in as few calls as possible.
+
+    Answers are sent in batches of at most BATCH_EVALUATION_SIZE. When they fit into a single
+    batch, the same call also returns the summary. Answers a batch leaves out, or returns
+    invalid results for, are evaluated one at a time.
+
+    Args:
+        evaluations (list): One dictionary per answer with "question" and "answer"; answers
+            still to be scored carry "pending": True, the rest are already evaluated.
 
+    Returns:
+        dict: "evaluations" (complete, in order), "final_score" and "summary".
+    """
+    results = [dict(e) for e in evaluations]
+    pending = [i for i, e in enumerate(results) if e.get("pending")]
+    batches = [pending[i:i + BATCH_EVALUATION_SIZE] for i in range(0, len(pending), BATCH_EVALUATION_SIZE)]
+    with_summary = len(batches) == 1
+    summaries = await asyncio.gather(*(_evaluate_batch_async(results, batch, with_summary) for batch in batches))
+
+    leftover = [i for i in pending if results[i].get("pending")]
+    if leftover:
+        logging.warning(f"Evaluating {len(leftover)} answer(s) individually after the batched call.")
+        individual = await asyncio.gather(*(evaluate_answer_async(results[i]["question"], results[i]["answer"]) for i in leftover))
+        for i, evaluation in zip(leftover, individual):
+            results[i].pop("pending", None)
+            results[i].update(evaluation)
+
+    summary = summaries[0] if with_summary else None
+    if summary is None:
+        summary_data = await get_interview_summary_async(results)
+    else:
+        summary_data = {"final_score": average_score(results), "summary": summary}
+    return {"evaluations": results, **summary_data}
+
+# --- Streaming API ---
+# Completions are requested with stream=True and fed through an incremental JSON parser,
+# so fields such as "score" and the first words of "feedback" reach the UI within the
+# time-to-first-token rather than after the whole completion.
+
+async def _stream_json_fields(stage_name: str, prompt: str, temperature: float):
+    """Yields (model, fields) with the top-level fields parsed so far each time a streamed chunk changes them."""
+    parser = IncrementalJSONParser()
+    with span(stage_name, model=OPENAI_MODEL, streaming=True) as stage:
+        # Streams aren't hedged and keep their own latency window (time to response headers)
+        deltas = stream_async(stage, stage_name, [{"role": "user", "content": prompt}],
+                              temperature=temperature, response_format={"type": "json_object"})
+        async for delta in deltas:
+            if parser.feed(delta):
+                if "time_to_first_field" not in stage.tags:
+                    stage.set(time_to_first_field=round(time.time() - stage.start, 3))
+                yield stage.tags["model"], dict(parser.fields)
+    if not parser.complete:
+        raise ValueError("Streamed response ended before the JSON object was complete.")
+
+async def evaluate_answer_stream(question: str, answer: str, speech_seconds: float = None, use_cache: bool = True):
+    """
+    Streaming variant of evaluate_answer. A memoized evaluation is yielded in one piece.
+
+    Args:
+        question (str): The interview question that was asked.
+        answer (str): The candidate's transcribed answer.
+        speech_seconds (float): Seconds of detected speech in the recording, if known.
+        use_cache (bool): Whether a memoized evaluation of the same answer may be returned.
+
+    Yields:
+        dict: The evaluation fields received so far. The last value yielded is the
+              complete evaluation, or the usual error dictionary on failure.
+    """
+    prescored = prescore_answer(question, answer, speech_seconds)
+    if prescored:
+        yield prescored
+        return
+    if not answer:
+        yield {"score": 0, "feedback": EVALUATION_UNAVAILABLE, "better_answer": "N/A"}
+        return
+    memo_key, cached = await asyncio.to_thread(_cached_evaluation, question, answer, use_cache)
+    if cached:
+        yield cached
+        return
+    try:
+        model = fields = None
+        async for model, fields in _stream_json_fields("evaluate_answer", _evaluation_prompt(question, answer), temperature=0.5):
+            yield fields
+    except Exception as e:
+        logging.error(f"Error evaluating answer with LLM: {e}")
+        yield {"score": 0, "feedback": EVALUATION_ERROR, "better_answer": "Could not be generated."}
+        return
+    # Stored outside the try so a memo cache failure never replaces the evaluation already yielded
+    await asyncio.to_thread(_store_evaluation, memo_key, fields, model)
+
+async def get_interview_summary_stream(evaluations: list, running_summary: str = None, summarized_turns: int = 0):
+    """
+    Streaming variant of get_interview_summary.
+
+    Args:
+        evaluations (list): A list of evaluation dictionaries for each answer.
+        running_summary (str): Running notes covering the first summarized_turns answers, if any.
+        summarized_turns (int): The number of answers the running notes cover.
+
+    Yields:
+        dict: The final score (available immediately) and the summary received so far.
+              The last value yielded is the complete summary.
+    """
+    if not evaluations:
+        yield {"final_score": 0, "summary": SUMMARY_UNAVAILABLE}
+        return
+
+    final_score = average_score(evaluations)
+    yield {"final_score": final_score, "summary": ""}
+    try:
+        async for _, fields in _stream_json_fields("get_interview_summary", _summary_prompt(evaluations, running_summary, summarized_turns), temperature=0.6):
+            if "summary" in fields:
+                yield {"final_score": final_score, "summary": fields["summary"]}
     except Exception as e:
         logging.error(f"Error generating summary with LLM: {e}")
-        return {"final_score": final_score, "summary": "An error occurred while generating the final summary."}
+        yield {"final_score": final_score, "summary": SUMMARY_ERROR}
 
 def load_static_questions() -> list:
     """Loads the fallback questions from the local JSON file."""
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+
+from metrics import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Results of expensive, deterministic-enough API calls (transcriptions, evaluations) are
+# memoized in an SQLite database, so retried submissions and re-scoring runs that send
+# the same input again are answered locally. The database is shared by every worker
+# process on a host and survives restarts.
+
+MEMO_CACHE = os.environ.get("MEMO_CACHE", "1") == "1"
+MEMO_DB_PATH = os.environ.get("MEMO_DB_PATH", "memo_cache.db")
+# Entries older than this are treated as missing and deleted
+MEMO_TTL_SECONDS = int(os.environ.get("MEMO_TTL_SECONDS", str(30 * 24 * 3600)))
+# Beyond this many entries the least recently used are deleted
+MEMO_MAX_ENTRIES = int(os.environ.get("MEMO_MAX_ENTRIES", "100000"))
+# Eviction runs at most this often, piggybacking on writes
+MEMO_EVICT_INTERVAL_SECONDS = int(os.environ.get("MEMO_EVICT_INTERVAL_SECONDS", "300"))
+
+# --- Keys ---
+
+def content_key(*parts) -> str:
+    """Returns a stable digest of the given parts (strings, numbers or bytes)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        # Length-prefixed, so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+def file_digest(path: str) -> str:
+    """Returns the SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of an answer, for cache keys."""
+    return " ".join((text or "").split()).casefold()
+
+# --- Cache ---
+
+class MemoCache:
+    """
+    A persistent key-value memo of JSON values, partitioned into namespaces
+    (e.g. "transcribe_audio", "evaluate_answer").
+
+    Entries expire after ttl_seconds; when there are more than max_entries, the least
+    recently used go first. Hit and miss counters are kept per namespace in this process.
+    """
+
+    def __init__(self, path: str = MEMO_DB_PATH, ttl_seconds: int = MEMO_TTL_SECONDS,
+                 max_entries: int = MEMO_MAX_ENTRIES, evict_interval_seconds: int = MEMO_EVICT_INTERVAL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.evict_interval_seconds = evict_interval_seconds
+        self._last_eviction = time.time()
+        # sqlite3 connections may not be shared between threads
+        self._local = threading.local()
+        self._counters_lock = threading.Lock()
+        self._counters = {}
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS memo_accessed_at ON memo (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace: str, outcome: str):
+        with self._counters_lock:
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0, "bypassed": 0})
+            counters[outcome] += 1
+
+    def get(self, namespace: str, key: str):
+        """
+        Returns a memoized value, refreshing its LRU position.
+
+        The cache only saves API calls, so a database error (e.g. "database is locked") is
+        logged and treated as a miss rather than failing the caller.
+
+        Returns:
+            The stored value, or None on a miss (including expired entries).
+        """
+        with span("memo_lookup", namespace=namespace) as lookup:
+            now = time.time()
+            try:
+                with self._connection() as conn:
+                    row = conn.execute("SELECT value, created_at FROM memo WHERE namespace = ? AND key = ?",
+                                       (namespace, key)).fetchone()
+                    if row and now - row[1] < self.ttl_seconds:
+                        conn.execute("UPDATE memo SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                                     (now, namespace, key))
+                        value = json.loads(row[0])
+                        self._count(namespace, "hits")
+                        lookup.set(cache="hit")
+                        return value
+                    if row:
+                        conn.execute("DELETE FROM memo WHERE namespace = ? AND key = ?", (namespace, key))
+            except (sqlite3.Error, ValueError) as e:
+                logging.error(f"Memo cache lookup in '{namespace}' failed: {e}")
+            self._count(namespace, "misses")
+            lookup.set(cache="miss")
+            return None
+
+    def put(self, namespace: str, key: str, value):
+        """Stores (or replaces) a value. Database errors are logged, never raised."""
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT INTO memo (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, "
+                    "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                    (namespace, key, json.dumps(value, ensure_ascii=False), now, now))
+            if now - self._last_eviction >= self.evict_interval_seconds:
+                self.evict()
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Memo cache write in '{namespace}' failed: {e}")
+
+    def record_bypass(self, namespace: str):
+        """Counts a call that skipped the lookup on purpose (its fresh result is still stored)."""
+        self._count(namespace, "bypassed")
+
+    def evict(self) -> int:
+        """Deletes expired entries, then the least recently used beyond max_entries."""
+        self._last_eviction = time.time()
+        with self._connection() as conn:
+            evicted = conn.execute("DELETE FROM memo WHERE created_at < ?",
+                                   (time.time() - self.ttl_seconds,)).rowcount
+            evicted += conn.execute(
+                "DELETE FROM memo WHERE rowid IN (SELECT rowid FROM memo ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)).rowcount
+        if evicted:
+            logging.info(f"Evicted {evicted} memo cache entr{'y' if evicted == 1 else 'ies'}.")
+        return evicted
+
+    def stats(self) -> dict:
+        """Returns entries per namespace and this process's hit/miss counters and hit rates."""
+        rows = self._connection().execute("SELECT namespace, COUNT(*) FROM memo GROUP BY namespace").fetchall()
+        entries = dict(rows)
+        with self._counters_lock:
+            counters = {namespace: dict(c) for namespace, c in self._counters.items()}
+        stats = {}
+        for namespace in sorted(set(entries) | set(counters)):
+            c = counters.get(namespace, {"hits": 0, "misses": 0, "bypassed": 0})
+            lookups = c["hits"] + c["misses"]
+            stats[namespace] = {"entries": entries.get(namespace, 0), **c,
+                                "hit_rate": round(c["hits"] / lookups, 3) if lookups else 0.0}
+        return stats
+
+    def render_prometheus(self) -> str:
+        """Renders the memo cache counters in the Prometheus text format."""
+        lines = ["# TYPE interview_memo_cache_lookups_total counter"]
+        stats = self.stats()
+        for namespace, s in stats.items():
+            for outcome in ("hits", "misses", "bypassed"):
+                lines.append(f'interview_memo_cache_lookups_total{{namespace="{namespace}",outcome="{outcome}"}} {s[outcome]}')
+        lines.append("# TYPE interview_memo_cache_hit_rate gauge")
+        for namespace, s in stats.items():
+            lines.append(f'interview_memo_cache_hit_rate{{namespace="{namespace}"}} {s["hit_rate"]}')
+        lines.append("# TYPE interview_memo_cache_entries gauge")
+        for namespace, s in stats.items():
+            lines.append(f'interview_memo_cache_entries{{namespace="{namespace}"}} {s["entries"]}')
+        return "\n".join(lines) + "\n"
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_memo_cache() -> MemoCache:
+    """Returns the process-wide memo cache, or None when MEMO_CACHE is off or it cannot be opened."""
+    global _default_cache
+    if not MEMO_CACHE:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = MemoCache()
+            except sqlite3.Error as e:
+                logging.error(f"Memo cache unavailable at {MEMO_DB_PATH}: {e}")
+                return None
+        return _default_cache
+
+def render_prometheus() -> str:
+    cache = get_memo_cache()
+    return cache.render_prometheus() if cache else ""
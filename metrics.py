@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Append every finished span to this JSONL file for offline analysis (disabled when unset)
+TRACE_FILE = os.environ.get("TRACE_FILE")
+
+# Histogram bucket upper bounds in seconds, from cache lookups up to slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# The interview session the current code runs on behalf of. Context variables follow
+# asyncio tasks and asyncio.to_thread calls, so helpers deep in the pipeline can tag
+# their spans without threading the session ID through every signature.
+_current_session = contextvars.ContextVar("current_session", default=None)
+
+class Histogram:
+    """A cumulative latency histogram with fixed buckets, in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile as the upper bound of the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+class Span:
+    """A timed pipeline stage. Tags such as byte or token counts can be added while it runs."""
+
+    def __init__(self, stage: str, tags: dict):
+        self.stage = stage
+        self.tags = tags
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, **tags):
+        self.tags.update({k: v for k, v in tags.items() if v is not None})
+
+class MetricsRegistry:
+    """Aggregates spans into per-stage histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def record(self, span: Span):
+        labels = (span.stage, str(span.tags.get("model", "")))
+        with self._lock:
+            self._histograms.setdefault(labels, Histogram()).observe(span.duration)
+            for name in ("bytes", "tokens", "prompt_tokens", "completion_tokens", "cached_tokens"):
+                if isinstance(span.tags.get(name), (int, float)):
+                    self._increment(f"{name}_total", labels, span.tags[name])
+            if span.tags.get("cache") == "hit":
+                self._increment("cache_hits_total", labels, 1)
+            elif span.tags.get("cache") == "miss":
+                self._increment("cache_misses_total", labels, 1)
+            if span.tags.get("fast_path") is True:
+                self._increment("fast_path_total", labels, 1)
+            elif span.tags.get("fast_path") is False:
+                self._increment("llm_path_total", labels, 1)
+            if span.error:
+                self._increment("errors_total", labels, 1)
+
+    def _increment(self, name, labels, amount):
+        key = (name,) + labels
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def histograms(self) -> dict:
+        """Returns a snapshot of the histograms by (stage, model)."""
+        with self._lock:
+            return dict(self._histograms)
+
+    def render_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP interview_stage_duration_seconds Latency of interview pipeline stages.",
+            "# TYPE interview_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (stage, model), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",model="{model}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'interview_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'interview_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"interview_stage_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"interview_stage_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            names = sorted({key[0] for key in self._counters})
+            for name in names:
+                lines.append(f"# TYPE interview_stage_{name} counter")
+                for (counter, stage, model), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f'interview_stage_{name}{{stage="{stage}",model="{model}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+registry = MetricsRegistry()
+_trace_lock = threading.Lock()
+
+@contextmanager
+def span(stage: str, **tags):
+    """
+    Times a pipeline stage and records it in the registry (and the trace file, if enabled).
+
+    Args:
+        stage (str): The stage name, e.g. "evaluate_answer".
+        **tags: Extra tags such as model, bytes or tokens. The current session ID is added automatically.
+
+    Yields:
+        Span: The running span; call span.set(...) to attach counts known only after the call.
+    """
+    current = Span(stage, {"session_id": _current_session.get(), **{k: v for k, v in tags.items() if v is not None}})
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        registry.record(current)
+        if TRACE_FILE:
+            _write_trace(current)
+
+def _write_trace(finished: Span):
+    record = {"stage": finished.stage, "start": finished.start, "duration": finished.duration,
+              "error": finished.error, **finished.tags}
+    try:
+        with _trace_lock, open(TRACE_FILE, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        logging.error(f"Could not write trace record: {e}")
+
+@contextmanager
+def session(session_id: str):
+    """Tags every span opened inside the block (including in tasks it spawns) with a session ID."""
+    token = _current_session.set(session_id)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+async def run_in_session(session_id: str, awaitable):
+    """Awaits a coroutine with its spans tagged by session ID."""
+    with session(session_id):
+        return await awaitable
+
+async def iterate_in_session(session_id: str, iterator):
+    """Iterates an async generator with its spans tagged by session ID."""
+    while True:
+        # The context variable is set only around each resumption, since a consumer
+        # may resume the generator from a different context every time
+        with session(session_id):
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+        yield item
+
+def usage_tags(usage) -> dict:
+    """Extracts token counts from an OpenAI usage object for span.set(...)."""
+    if usage is None:
+        return {}
+    return {
+        "tokens": getattr(usage, "total_tokens", None),
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        # Prompt tokens served from the provider's prompt cache
+        "cached_tokens": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+    }
@@ -1,5 +1,13 @@
 from fpdf import FPDF
 
+# The core PDF fonts only cover Latin-1; common typographic characters from LLM output are
+# mapped to plain equivalents and anything else becomes "?"
+_PLAIN = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"',
+                        "–": "-", "—": "-", "…": "...", "•": "-"})
+
+def _latin1(text):
+    return str(text).translate(_PLAIN).encode("latin-1", "replace").decode("latin-1")
+
 class PDF(FPDF):
     def header(self):
         self.set_font("Arial", "B", 14)
@@ -10,23 +18,32 @@ class PDF(FPDF):
         self.set_font("Arial", "I", 8)
         self.cell(0, 10, f"Page {self.page_no()}", 0, 0, "C")
 
-def generate_pdf(candidate_name, role, summary, questions, answers):
+def build_pdf(candidate_name, role, summary, questions, answers):
     pdf = PDF()
     pdf.add_page()
     pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, f"Candidate: {candidate_name}", ln=True)
+    pdf.cell(0, 10, _latin1(f"Candidate: {candidate_name}"), ln=True)
     pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 10, f"Role: {role}", ln=True)
-    pdf.cell(0, 10, f"Overall Score: {summary.get('overall_score','N/A')}/10", ln=True)
-    pdf.cell(0, 10, f"Recommendation: {summary.get('recommendation','N/A')}", ln=True)
+    pdf.cell(0, 10, _latin1(f"Role: {role}"), ln=True)
+    pdf.cell(0, 10, _latin1(f"Overall Score: {summary.get('overall_score','N/A')}/10"), ln=True)
+    pdf.cell(0, 10, _latin1(f"Recommendation: {summary.get('recommendation','N/A')}"), ln=True)
+    if summary.get("summary"):
+        pdf.multi_cell(0, 10, _latin1(f"Summary: {summary['summary']}"))
     pdf.ln(10)
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "Detailed Q&A:", ln=True)
     pdf.ln(5)
     pdf.set_font("Arial", "", 12)
     for i, (q, a) in enumerate(zip(questions, answers), 1):
-        pdf.multi_cell(0, 10, f"Q{i}: {q.get('text','')}")
-        pdf.multi_cell(0, 10, f"Answer: {a.get('answer','')}")
-        pdf.multi_cell(0, 10, f"Feedback: {a.get('feedback','')} (Score: {a.get('score','N/A')}/10)")
+        pdf.multi_cell(0, 10, _latin1(f"Q{i}: {q.get('text','')}"))
+        pdf.multi_cell(0, 10, _latin1(f"Answer: {a.get('answer','')}"))
+        pdf.multi_cell(0, 10, _latin1(f"Feedback: {a.get('feedback','')} (Score: {a.get('score','N/A')}/10)"))
         pdf.ln(5)
-    return pdf.output(dest="S").encode("latin-1")
+    return pdf
+
+def generate_pdf(candidate_name, role, summary, questions, answers):
+    return build_pdf(candidate_name, role, summary, questions, answers).output(dest="S").encode("latin-1")
+
+# Write straight to a file, without holding the rendered document as bytes
+def write_pdf(path, candidate_name, role, summary, questions, answers):
+    build_pdf(candidate_name, role, summary, questions, answers).output(path, "F")
@@ -0,0 +1,231 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+
+# Run as a script, this module is the entry point: .env is loaded before any module
+# (this one included) reads its settings
+if __name__ == "__main__":
+    from clients import load_environment
+    load_environment()
+
+from llm_utils import generate_questions, generate_questions_async, load_static_questions
+
+# fcntl is POSIX-only; without it the bank is still written atomically, but two processes
+# filling pools at the same moment may drop one of the new pools.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+QUESTION_BANK_PATH = os.environ.get("QUESTION_BANK_PATH", "question_bank.json")
+# Questions generated per role pool; individual roles can override this when filled
+QUESTION_POOL_SIZE = int(os.environ.get("QUESTION_POOL_SIZE", "30"))
+# Pools older than this are still served, but are regenerated in the background
+QUESTION_BANK_TTL_SECONDS = int(os.environ.get("QUESTION_BANK_TTL_SECONDS", str(7 * 24 * 3600)))
+# Comma-separated roles whose pools are created automatically on first use. Any other role
+# only gets a pool through `python question_bank.py fill`, so free-text role names typed by
+# candidates cannot grow the bank (or spend tokens on pool fills) without bound.
+QUESTION_BANK_ROLES = os.environ.get("QUESTION_BANK_ROLES", "")
+
+def normalize_role(role: str) -> str:
+    """Normalizes a job role so that e.g. "Data  Scientist!" and "data scientist" share a pool."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s+#]", " ", role.lower())).strip()
+
+class QuestionBank:
+    """
+    Persistent pools of LLM-generated questions, keyed by normalized role.
+
+    Lookups go through tiers, fastest first: a pool for the role (refilled in the
+    background once it is older than the TTL), then a live generate_questions call
+    for the session, and finally the static questions from questions.json. Pools are
+    only created automatically for the configured roles.
+    """
+
+    def __init__(self, path: str = QUESTION_BANK_PATH, pool_size: int = QUESTION_POOL_SIZE,
+                 ttl_seconds: int = QUESTION_BANK_TTL_SECONDS, roles: str = QUESTION_BANK_ROLES):
+        self.path = path
+        self.pool_size = pool_size
+        self.ttl_seconds = ttl_seconds
+        self.auto_roles = {normalize_role(role) for role in roles.split(",") if role.strip()}
+        self._lock = threading.Lock()
+        self._refilling = {}
+        self._pools, self._mtime = {}, None
+
+    # --- Persistence ---
+    # The bank file is shared by every app worker and the `fill` CLI. Readers reload it
+    # whenever its mtime changes, and writers merge their pool into the file's current
+    # contents under an exclusive lock, so no process overwrites another's pools.
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _current_pools(self) -> dict:
+        # Must be called with self._lock held
+        mtime = self._file_mtime()
+        if mtime != self._mtime:
+            self._pools, self._mtime = self._load(), mtime
+        return self._pools
+
+    @contextmanager
+    def _file_lock(self):
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _store(self, key: str, questions: list, pool_size: int):
+        # Keep one copy of each question text
+        unique = list({q["text"]: q for q in questions if isinstance(q, dict) and q.get("text")}.values())
+        with self._lock, self._file_lock():
+            pools = self._load()
+            pools[key] = {"questions": unique, "pool_size": pool_size, "generated_at": time.time()}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(pools, f)
+            os.replace(tmp_path, self.path)
+            self._pools, self._mtime = pools, self._file_mtime()
+
+    def _pool(self, key: str) -> dict:
+        with self._lock:
+            return self._current_pools().get(key)
+
+    def fill(self, role: str, pool_size: int = None) -> int:
+        """
+        Generates (or regenerates) the pool for a role. Blocks until the LLM call returns.
+
+        Returns:
+            int: The number of questions now in the pool.
+        """
+        key = normalize_role(role)
+        existing = self._pool(key)
+        pool_size = pool_size or (existing or {}).get("pool_size") or self.pool_size
+        questions = generate_questions(role, pool_size, fallback=False)
+        if not questions:
+            logging.error(f"Could not fill question pool for role '{key}'.")
+            return len((existing or {}).get("questions", []))
+        self._store(key, questions, pool_size)
+        logging.info(f"Filled question pool for role '{key}' with {len(questions)} question(s).")
+        return len(questions)
+
+    def refill_in_background(self, role: str):
+        """Regenerates a role's pool on a daemon thread, unless a refill is already running."""
+        key = normalize_role(role)
+        def refill():
+            try:
+                self.fill(role)
+            finally:
+                with self._lock:
+                    self._refilling.pop(key, None)
+
+        with self._lock:
+            if key in self._refilling:
+                return
+            thread = self._refilling[key] = threading.Thread(target=refill, name=f"question-refill-{key}", daemon=True)
+        thread.start()
+
+    def wait_for_refills(self, timeout: float = None):
+        """Blocks until the background refills running now have finished."""
+        with self._lock:
+            threads = list(self._refilling.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def _sample_pool(self, role: str, num_questions: int) -> list:
+        key = normalize_role(role)
+        pool = self._pool(key)
+        if not pool:
+            if key in self.auto_roles:
+                self.refill_in_background(role)
+            return None
+        if time.time() - pool["generated_at"] > self.ttl_seconds:
+            # Stale questions are still good enough to serve while new ones are generated
+            self.refill_in_background(role)
+        if len(pool["questions"]) < num_questions:
+            return None
+        # random.sample never repeats a question within the session
+        return random.sample(pool["questions"], num_questions)
+
+    def sample(self, role: str, num_questions: int) -> list:
+        """
+        Returns num_questions distinct questions for a role.
+
+        Args:
+            role (str): The job role.
+            num_questions (int): The number of questions wanted.
+
+        Returns:
+            list: A list of question dictionaries.
+        """
+        return (
+            self._sample_pool(role, num_questions)
+            or generate_questions(role, num_questions, fallback=False)
+            or load_static_questions()
+        )
+
+    async def sample_async(self, role: str, num_questions: int) -> list:
+        """Asyncio variant of sample; only the live-generation tier awaits the LLM."""
+        return (
+            self._sample_pool(role, num_questions)
+            or await generate_questions_async(role, num_questions, fallback=False)
+            or load_static_questions()
+        )
+
+    def roles(self) -> dict:
+        """Returns each pooled role with its question count and age in seconds."""
+        with self._lock:
+            return {
+                key: {"questions": len(pool["questions"]), "age_seconds": int(time.time() - pool["generated_at"])}
+                for key, pool in self._current_pools().items()
+            }
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+def get_question_bank() -> QuestionBank:
+    """Returns the process-wide question bank."""
+    global _default_bank
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = QuestionBank()
+        return _default_bank
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the role-keyed question bank.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    fill_parser = subcommands.add_parser("fill", help="Generate question pools ahead of time.")
+    fill_parser.add_argument("roles", nargs="+", help="Job roles to generate pools for.")
+    fill_parser.add_argument("--size", type=int, default=None, help="Questions per pool.")
+    subcommands.add_parser("list", help="List pooled roles.")
+    args = parser.parse_args()
+
+    bank = get_question_bank()
+    if args.command == "fill":
+        sys.exit(0 if all(bank.fill(role, args.size) for role in args.roles) else 1)
+    elif args.command == "list":
+        for key, info in bank.roles().items():
+            print(f"{key}: {info['questions']} question(s), {info['age_seconds']} s old")
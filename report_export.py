@@ -0,0 +1,205 @@
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Run as a script, this module is the entry point: .env is loaded before any module
+# (this one included) reads its settings
+if __name__ == "__main__":
+    from clients import load_environment
+    load_environment()
+
+from pdf_report import write_pdf
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Reports are rendered in a pool of worker processes, since PDF layout is CPU-bound pure
+# Python and would otherwise hold the GIL of the process serving interviews.
+
+REPORT_DIR = os.environ.get("REPORT_DIR", "reports")
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Bump when the report layout changes so cached PDFs are rebuilt
+REPORT_FORMAT_VERSION = 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Forking the (multi-threaded) app process is unsafe. A fork server imports the
+            # main module once and forks clean workers from itself; spawn is the fallback
+            # where fork servers are unavailable
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(max_workers=REPORT_WORKERS,
+                                            mp_context=multiprocessing.get_context(method))
+        return _executor
+
+def _submit(path: str, inputs: tuple):
+    try:
+        return _get_executor().submit(_render, path, inputs)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool rather than failing for good
+        logging.warning("Report process pool broke; starting a new one.")
+        shutdown(wait=False)
+        return _get_executor().submit(_render, path, inputs)
+
+def shutdown(wait: bool = True):
+    """Stops the report worker processes, e.g. at the end of a batch export."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+# --- Report Inputs and Caching ---
+
+def is_complete(state: dict) -> bool:
+    """Whether a session's interview has been answered to the end."""
+    return bool(state.get("evaluations")) and state.get("current_question_index", 0) >= len(state.get("questions", []))
+
+def report_inputs(state: dict) -> tuple:
+    """Returns the generate_pdf arguments (candidate, role, summary, questions, answers) for a session."""
+    summary = state.get("summary") or {}
+    return (
+        state.get("candidate_name", ""),
+        state.get("role", ""),
+        {"overall_score": summary.get("final_score", state.get("running_score", "N/A")),
+         "summary": summary.get("summary", "")},
+        state.get("questions", []),
+        state.get("evaluations", []),
+    )
+
+def report_path(session_id: str, inputs: tuple, report_dir: str = REPORT_DIR) -> str:
+    """
+    Returns where a session's report is cached: <session_id>-<content hash>.pdf.
+
+    The hash covers everything printed in the report, so a finished interview maps to
+    one file and any change (e.g. deferred scores arriving) maps to a new one.
+    """
+    payload = json.dumps([REPORT_FORMAT_VERSION, inputs], sort_keys=True, ensure_ascii=False, default=str)
+    content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(report_dir, f"{session_id}-{content_hash}.pdf")
+
+def _render(path: str, inputs: tuple) -> str:
+    # Runs in a worker process. Written under a temporary name and renamed, so a cached
+    # path always holds a complete file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write_pdf(tmp_path, *inputs)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+def _remove_stale(session_id: str, current_path: str):
+    # Earlier versions of a session's report are superseded by the one just rendered
+    pattern = os.path.join(os.path.dirname(current_path), f"{glob.escape(session_id)}-*.pdf")
+    for path in glob.glob(pattern):
+        if path != current_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# --- Rendering ---
+
+async def render_report_async(state: dict, report_dir: str = REPORT_DIR) -> str:
+    """
+    Returns the path of a session's PDF report, rendering it in the process pool unless
+    an identical report is already cached. The event loop is never blocked.
+
+    Returns:
+        str: The report path, or None if rendering failed.
+    """
+    inputs = report_inputs(state)
+    path = report_path(state["session_id"], inputs, report_dir)
+    if os.path.exists(path):
+        return path
+    os.makedirs(report_dir, exist_ok=True)
+    try:
+        await asyncio.wrap_future(_submit(path, inputs))
+    except Exception as e:
+        logging.error(f"Report for session {state['session_id']} could not be rendered: {e}")
+        return None
+    _remove_stale(state["session_id"], path)
+    return path
+
+def export_reports(states, report_dir: str = REPORT_DIR):
+    """
+    Renders reports for many sessions in parallel, each written to disk as it finishes.
+
+    Args:
+        states: An iterable of session states; incomplete interviews are skipped.
+        report_dir (str): Where the PDFs are written.
+
+    Yields:
+        tuple: (session_id, path, cached) in completion order; path is None on failure.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    cached, futures = [], {}
+    for state in states:
+        if not state or not is_complete(state):
+            continue
+        inputs = report_inputs(state)
+        path = report_path(state["session_id"], inputs, report_dir)
+        if os.path.exists(path):
+            cached.append((state["session_id"], path))
+        else:
+            futures[_submit(path, inputs)] = (state["session_id"], path)
+    # Cached reports are reported while the pool works through the rest
+    for session_id, path in cached:
+        yield session_id, path, True
+    for future in as_completed(futures):
+        session_id, path = futures[future]
+        try:
+            future.result()
+        except Exception as e:
+            logging.error(f"Report for session {session_id} could not be rendered: {e}")
+            yield session_id, None, False
+            continue
+        _remove_stale(session_id, path)
+        yield session_id, path, False
+
+if __name__ == "__main__":
+    from session_store import get_session_store
+
+    parser = argparse.ArgumentParser(description="Export PDF reports for completed interviews.")
+    parser.add_argument("session_ids", nargs="*", help="Sessions to export (default: every stored session).")
+    parser.add_argument("--role", help="Only export interviews for this role.")
+    parser.add_argument("--output-dir", default=REPORT_DIR, help="Where the PDFs are written.")
+    args = parser.parse_args()
+
+    store = get_session_store()
+    session_ids = args.session_ids or store.session_ids()
+    states = (store.load(session_id) for session_id in session_ids)
+    if args.role:
+        states = (s for s in states if s and s.get("role", "").lower() == args.role.lower())
+
+    started = time.perf_counter()
+    counts = {"rendered": 0, "cached": 0, "failed": 0}
+    try:
+        for session_id, path, was_cached in export_reports(states, args.output_dir):
+            outcome = "failed" if path is None else "cached" if was_cached else "rendered"
+            counts[outcome] += 1
+            print(f"{session_id}\t{outcome}\t{path or ''}", flush=True)
+    finally:
+        shutdown()
+    elapsed = time.perf_counter() - started
+    rate = counts["rendered"] / elapsed if elapsed else 0.0
+    print(f"{counts['rendered']} rendered, {counts['cached']} cached, {counts['failed']} failed "
+          f"in {elapsed:.1f} s ({rate:.1f} reports/s)", file=sys.stderr)
+    sys.exit(1 if counts["failed"] else 0)
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Archive Layout ---
+# One directory per archived interview, holding interview.json and the recorded answers:
+#
+#   archive/<interview_id>/interview.json
+#       {"candidate_name": "...", "role": "...",
+#        "questions": [{"text": "...", "audio": "answer_1.wav"}, ...]}
+#
+# "audio" is relative to the interview directory. A question may carry its transcript as
+# "answer" instead, in which case it is not transcribed again.
+
+INTERVIEW_FILENAME = "interview.json"
+# Default in-flight calls per stage; transcription uploads are the heaviest requests
+DEFAULT_LIMITS = {"transcribe": 8, "evaluate": 16, "summary": 4}
+
+def iter_archive(archive_dir: str):
+    """Yields (interview_id, directory, metadata) for each archived interview, in name order."""
+    for name in sorted(os.listdir(archive_dir)):
+        directory = os.path.join(archive_dir, name)
+        path = os.path.join(directory, INTERVIEW_FILENAME)
+        if not os.path.isfile(path):
+            continue
+        try:
+            with open(path, "r") as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Skipping {name}: unreadable {INTERVIEW_FILENAME} ({e})")
+            continue
+        yield name, directory, metadata
+
+# --- Checkpoints ---
+
+class Checkpoint:
+    """
+    Append-only JSONL record of finished work, so an interrupted run resumes where it stopped.
+
+    Every completed stage of every answer is one line ({"interview", "index", "stage", ...});
+    a finished interview is a line in the results file instead. Both files are read back
+    on start-up; a line cut short by a crash is ignored.
+    """
+
+    def __init__(self, results_path: str):
+        self.results_path = results_path
+        self.checkpoint_path = f"{results_path}.checkpoint.jsonl"
+        self.finished = {record["interview"] for record in self._read(results_path)}
+        self.stages = {}
+        for record in self._read(self.checkpoint_path):
+            if record["interview"] not in self.finished:
+                self.stages[(record["interview"], record["index"], record["stage"])] = record["result"]
+        self._results = open(results_path, "a")
+        self._checkpoint = open(self.checkpoint_path, "a")
+
+    @staticmethod
+    def _read(path: str) -> list:
+        records = []
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass
+        except FileNotFoundError:
+            pass
+        return records
+
+    def get(self, interview_id: str, index: int, stage: str):
+        return self.stages.get((interview_id, index, stage))
+
+    def record_stage(self, interview_id: str, index: int, stage: str, result):
+        self._write(self._checkpoint, {"interview": interview_id, "index": index, "stage": stage, "result": result})
+
+    def record_interview(self, result: dict):
+        self._write(self._results, result)
+
+    @staticmethod
+    def _write(f, record: dict):
+        # Writes come from the event loop thread only, so lines never interleave
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+
+    def close(self):
+        self._results.close()
+        self._checkpoint.close()
+
+# --- Pipeline ---
+
+class RescorePipeline:
+    """
+    Re-scores archived interviews as a streaming pipeline: transcribe -> evaluate -> summary.
+
+    Answers flow through the stages independently, so transcription of one interview
+    overlaps with evaluation and summaries of others. Each stage has its own bound on
+    in-flight calls, and only a bounded number of interviews is loaded at once.
+    """
+
+    def __init__(self, checkpoint: Checkpoint, limits: dict, max_interviews: int, use_cache: bool = True):
+        self.checkpoint = checkpoint
+        # False re-evaluates every answer even if the memo cache has a result for it
+        self.use_cache = use_cache
+        self.limits = limits
+        self.max_interviews = max_interviews
+        self._stage_gates = {stage: asyncio.Semaphore(limit) for stage, limit in limits.items()}
+        self.durations = {stage: [] for stage in limits}
+        self.counts = {"interviews": 0, "answers": 0, "resumed_stages": 0, "skipped_interviews": 0, "failed": 0}
+
+    async def _stage(self, stage: str, interview_id: str, index: int, make_call):
+        from llm_utils import is_fallback
+
+        # A stage result already in the checkpoint is reused instead of calling the API again
+        cached = self.checkpoint.get(interview_id, index, stage)
+        if cached is not None:
+            self.counts["resumed_stages"] += 1
+            return cached
+        async with self._stage_gates[stage]:
+            started = time.perf_counter()
+            result = await make_call()
+            self.durations[stage].append(time.perf_counter() - started)
+        if is_fallback(result):
+            # Failed calls are not checkpointed, so the interview is retried on the next run
+            raise RuntimeError(f"{stage} failed for answer {index}")
+        self.checkpoint.record_stage(interview_id, index, stage, result)
+        return result
+
+    async def _answer(self, interview_id: str, directory: str, index: int, question: dict) -> dict:
+        from llm_utils import evaluate_answer_async, UNTRANSCRIBED_ANSWER, PRESCORE_MIN_SPEECH_SECONDS
+        from stt_utils import transcribe_audio_async, speech_duration
+
+        async def transcribe():
+            if question.get("answer"):
+                return {"answer": question["answer"], "speech_seconds": None}
+            path = os.path.join(directory, question.get("audio", ""))
+            answer, speech_seconds = await asyncio.gather(
+                transcribe_audio_async(path), asyncio.to_thread(speech_duration, path))
+            silent = speech_seconds is not None and speech_seconds < PRESCORE_MIN_SPEECH_SECONDS
+            if not answer and os.path.exists(path) and not silent:
+                # A failed transcription of a real recording is not checkpointed (and would
+                # otherwise be scored 0), so the next run transcribes it again
+                raise RuntimeError(f"transcription failed for answer {index}")
+            return {"answer": answer or UNTRANSCRIBED_ANSWER, "speech_seconds": speech_seconds}
+
+        transcript = await self._stage("transcribe", interview_id, index, transcribe)
+        evaluation = await self._stage("evaluate", interview_id, index, lambda: evaluate_answer_async(
+            question.get("text", ""), transcript["answer"], transcript["speech_seconds"], use_cache=self.use_cache))
+        self.counts["answers"] += 1
+        return {"question": question.get("text", ""), "answer": transcript["answer"], **evaluation}
+
+    async def _interview(self, interview_id: str, directory: str, metadata: dict):
+        from llm_utils import get_interview_summary_async, OPENAI_MODEL
+
+        questions = metadata.get("questions", [])
+        evaluations = await asyncio.gather(*(
+            self._answer(interview_id, directory, index, question) for index, question in enumerate(questions)))
+        summary = await self._stage("summary", interview_id, -1, lambda: get_interview_summary_async(list(evaluations)))
+        self.checkpoint.record_interview({
+            "interview": interview_id,
+            "candidate_name": metadata.get("candidate_name", ""),
+            "role": metadata.get("role", ""),
+            "model": OPENAI_MODEL,
+            "evaluations": list(evaluations),
+            "final_score": summary.get("final_score"),
+            "summary": summary.get("summary"),
+            "rescored_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        self.counts["interviews"] += 1
+
+    async def run(self, interviews) -> float:
+        """Re-scores every interview not yet in the results file and returns the elapsed seconds."""
+        started = time.perf_counter()
+        slots = asyncio.Semaphore(self.max_interviews)
+        tasks = set()
+
+        async def run_one(interview_id, directory, metadata):
+            try:
+                await self._interview(interview_id, directory, metadata)
+            except Exception as e:
+                self.counts["failed"] += 1
+                logging.error(f"Re-scoring {interview_id} failed: {e}")
+            finally:
+                slots.release()
+
+        # Interviews are read from the archive only as slots free up
+        for interview_id, directory, metadata in interviews:
+            if interview_id in self.checkpoint.finished:
+                self.counts["skipped_interviews"] += 1
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(run_one(interview_id, directory, metadata))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def print_report(pipeline: RescorePipeline, elapsed: float):
+    counts = pipeline.counts
+    print(f"\nRe-scored {counts['interviews']} interview(s) ({counts['answers']} answers) in {elapsed:.1f} s; "
+          f"{counts['skipped_interviews']} already done, {counts['resumed_stages']} stage result(s) resumed, "
+          f"{counts['failed']} failed", file=sys.stderr)
+    if elapsed:
+        print(f"  throughput: {counts['interviews'] / elapsed * 60:.1f} interviews/min, "
+              f"{counts['answers'] / elapsed:.2f} answers/s", file=sys.stderr)
+    print(f"  {'stage':<12}{'limit':>7}{'calls':>7}{'p50':>9}{'p95':>9}", file=sys.stderr)
+    for stage, values in pipeline.durations.items():
+        print(f"  {stage:<12}{pipeline.limits[stage]:>7}{len(values):>7}"
+              f"{_percentile(values, 0.50):>9.3f}{_percentile(values, 0.95):>9.3f}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score archived interviews with the current prompts and model.")
+    parser.add_argument("archive", help="Directory with one sub-directory (interview.json + audio) per interview.")
+    parser.add_argument("--output", default="rescored.jsonl",
+                        help="Results file, one interview per line; <output>.checkpoint.jsonl holds partial progress.")
+    parser.add_argument("--transcribe-concurrency", type=int, default=DEFAULT_LIMITS["transcribe"])
+    parser.add_argument("--evaluate-concurrency", type=int, default=DEFAULT_LIMITS["evaluate"])
+    parser.add_argument("--summary-concurrency", type=int, default=DEFAULT_LIMITS["summary"])
+    parser.add_argument("--max-interviews", type=int, default=32, help="Interviews in progress at once.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-evaluate answers even when the memo cache has an evaluation for them.")
+    parser.add_argument("--mock", action="store_true", help="Run against a local mock of the OpenAI API.")
+    # Latency/failure options of the mock server
+    from benchmarks.mock_openai_server import add_mock_arguments
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    from clients import load_environment
+    load_environment()
+    if args.mock:
+        from benchmarks.mock_openai_server import start_mock_server, mock_config_from_args
+        server = start_mock_server(mock_config_from_args(args))
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+    limits = {"transcribe": args.transcribe_concurrency, "evaluate": args.evaluate_concurrency,
+              "summary": args.summary_concurrency}
+    checkpoint = Checkpoint(args.output)
+    pipeline = RescorePipeline(checkpoint, limits, args.max_interviews, use_cache=not args.no_cache)
+    try:
+        elapsed = asyncio.run(pipeline.run(iter_archive(args.archive)))
+    finally:
+        checkpoint.close()
+    print_report(pipeline, elapsed)
+    sys.exit(1 if pipeline.counts["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+
+# Upper bound on a single call, including a hedged duplicate. Each stage can be tuned
+# with <STAGE>_DEADLINE_SECONDS, e.g. EVALUATE_ANSWER_DEADLINE_SECONDS=10.
+DEFAULT_DEADLINE_SECONDS = float(os.environ.get("CALL_DEADLINE_SECONDS", "20"))
+STAGE_DEADLINES = {
+    "generate_questions": 20.0,
+    "evaluate_answer": 15.0,
+    "evaluate_batch": 45.0,
+    "get_interview_summary": 20.0,
+    "summarize_interview": 20.0,
+    "transcribe_audio": 30.0,
+}
+
+# A duplicate request is sent once a call has been outstanding for longer than the
+# stage's recent p95 latency; whichever response arrives first is used.
+HEDGE_ENABLED = os.environ.get("HEDGE_ENABLED", "1") == "1"
+# Successful call latencies kept per stage for the p95 estimate
+HEDGE_WINDOW = int(os.environ.get("HEDGE_WINDOW", "200"))
+# No hedging until the window holds this many samples
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+# Largest fraction of recent calls that may be hedged, so a slow upstream doesn't get twice the load
+HEDGE_BUDGET = float(os.environ.get("HEDGE_BUDGET", "0.1"))
+
+# Consecutive failures (errors or missed deadlines) after which the circuit opens...
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# ...and how long it stays open before a single trial call is let through
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+# Blocking calls (and their hedges) run here so the caller can stop waiting at the deadline
+MAX_WORKERS = int(os.environ.get("CALL_MAX_WORKERS", "32"))
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is currently failing."""
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no response arrived within the stage's deadline."""
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker for one upstream API.
+
+    Closed: calls go through. Open: calls fail immediately with CircuitOpenError, so
+    callers return their fallbacks at once. Half-open: after CIRCUIT_RESET_SECONDS one
+    trial call goes through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"Circuit for '{self.name}' is open; upstream is degraded.")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logging.info(f"Circuit for '{self.name}' closed.")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """Frees the half-open trial slot of a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logging.warning(f"Circuit for '{self.name}' opened after {self.failures} failure(s).")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+class CallPolicy:
+    """Deadline, hedging statistics and circuit breaker for one pipeline stage."""
+
+    def __init__(self, stage: str, deadline: float, breaker: CircuitBreaker):
+        self.stage = stage
+        self.deadline = deadline
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=HEDGE_WINDOW)
+        self._hedged = deque(maxlen=HEDGE_WINDOW)
+
+    def hedge_delay(self) -> float:
+        """Returns how long to wait before hedging, or None if this call must not be hedged."""
+        with self._lock:
+            if not HEDGE_ENABLED or len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            if self._hedged and sum(self._hedged) / len(self._hedged) >= HEDGE_BUDGET:
+                return None
+            ordered = sorted(self._latencies)
+            p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        delay = max(HEDGE_MIN_DELAY_SECONDS, p95)
+        return delay if delay < self.deadline else None
+
+    def record(self, latency: float = None, hedged: bool = False):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self._hedged.append(hedged)
+
+_registry_lock = threading.Lock()
+_breakers = {}
+_policies = {}
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="upstream-call")
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    with _registry_lock:
+        if upstream not in _breakers:
+            _breakers[upstream] = CircuitBreaker(upstream)
+        return _breakers[upstream]
+
+def get_policy(stage: str, upstream: str = "chat") -> CallPolicy:
+    """Returns the process-wide policy for a stage, sharing one circuit breaker per upstream."""
+    breaker = get_breaker(upstream)
+    with _registry_lock:
+        if stage not in _policies:
+            default = STAGE_DEADLINES.get(stage, DEFAULT_DEADLINE_SECONDS)
+            deadline = float(os.environ.get(f"{stage.upper()}_DEADLINE_SECONDS", default))
+            _policies[stage] = CallPolicy(stage, deadline, breaker)
+        return _policies[stage]
+
+def _finish(policy: CallPolicy, started: float, hedged: bool, result=None, error: BaseException = None):
+    if error is None:
+        policy.breaker.record_success()
+        policy.record(time.perf_counter() - started, hedged)
+        return result
+    policy.breaker.record_failure()
+    policy.record(hedged=hedged)
+    raise error
+
+def call(stage: str, make_call, upstream: str = "chat", hedge: bool = True):
+    """
+    Runs a blocking upstream call under the stage's deadline, hedging and circuit breaker.
+
+    Args:
+        stage (str): The pipeline stage, e.g. "evaluate_answer".
+        make_call (callable): Called with the remaining deadline in seconds (pass it on as
+            the client's timeout); may be called twice when the request is hedged.
+        upstream (str): The API whose circuit breaker guards the call.
+        hedge (bool): Whether a duplicate request may be sent.
+
+    Returns:
+        The first successful result.
+
+    Raises:
+        CircuitOpenError: The upstream is degraded; nothing was sent.
+        DeadlineExceeded: No response arrived in time.
+    """
+    policy = get_policy(stage, upstream)
+    policy.breaker.before_call()
+    started = time.perf_counter()
+    hedge_at = policy.hedge_delay() if hedge else None
+    pending = {_executor.submit(make_call, policy.deadline)}
+    hedged = False
+    error = None
+    while pending:
+        elapsed = time.perf_counter() - started
+        if elapsed >= policy.deadline:
+            break
+        wake = policy.deadline if hedge_at is None else min(policy.deadline, hedge_at)
+        done, pending = concurrent.futures.wait(pending, timeout=wake - elapsed,
+                                                return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # A still-running duplicate finishes in the background, bounded by its own timeout
+                return _finish(policy, started, hedged, result=future.result())
+            error = future.exception()
+        if pending and hedge_at is not None and time.perf_counter() - started >= hedge_at:
+            logging.info(f"Hedging slow '{stage}' call after {hedge_at:.2f} s.")
+            pending.add(_executor.submit(make_call, policy.deadline - hedge_at))
+            hedged, hedge_at = True, None
+    if pending or error is None:
+        error = DeadlineExceeded(f"'{stage}' did not respond within {policy.deadline:.1f} s.")
+    return _finish(policy, started, hedged, error=error)
+
+async def call_async(stage: str, make_call, upstream: str = "chat", hedge: bool = True):
+    """
+    Asyncio variant of call. make_call returns a coroutine; a losing duplicate is cancelled.
+    """
+    policy = get_policy(stage, upstream)
+    policy.breaker.before_call()
+    started = time.perf_counter()
+    hedge_at = policy.hedge_delay() if hedge else None
+    pending = {asyncio.ensure_future(make_call(policy.deadline))}
+    hedged = False
+    error = None
+    try:
+        while pending:
+            elapsed = time.perf_counter() - started
+            if elapsed >= policy.deadline:
+                break
+            wake = policy.deadline if hedge_at is None else min(policy.deadline, hedge_at)
+            done, pending = await asyncio.wait(pending, timeout=wake - elapsed, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return _finish(policy, started, hedged, result=task.result())
+                error = task.exception()
+            if pending and hedge_at is not None and time.perf_counter() - started >= hedge_at:
+                logging.info(f"Hedging slow '{stage}' call after {hedge_at:.2f} s.")
+                pending.add(asyncio.ensure_future(make_call(policy.deadline - hedge_at)))
+                hedged, hedge_at = True, None
+        if pending or error is None:
+            error = DeadlineExceeded(f"'{stage}' did not respond within {policy.deadline:.1f} s.")
+        return _finish(policy, started, hedged, error=error)
+    except asyncio.CancelledError:
+        # The caller went away (e.g. the client disconnected). Without this a cancelled
+        # half-open probe would keep the circuit from ever closing again
+        policy.breaker.release_probe()
+        raise
+    finally:
+        for task in pending:
+            task.cancel()
+
+def render_prometheus() -> str:
+    """Renders circuit breaker states (0 closed, 1 half-open, 2 open) and hedge counts."""
+    levels = {"closed": 0, "half_open": 1, "open": 2}
+    lines = ["# TYPE interview_circuit_state gauge"]
+    with _registry_lock:
+        breakers = dict(_breakers)
+        policies = dict(_policies)
+    for name, breaker in sorted(breakers.items()):
+        lines.append(f'interview_circuit_state{{upstream="{name}"}} {levels[breaker.state]}')
+    lines.append("# TYPE interview_hedged_calls_ratio gauge")
+    for stage, policy in sorted(policies.items()):
+        with policy._lock:
+            ratio = sum(policy._hedged) / len(policy._hedged) if policy._hedged else 0.0
+        lines.append(f'interview_hedged_calls_ratio{{stage="{stage}"}} {ratio:.3f}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# "sqlite" shares sessions between worker processes and across restarts; "memory" keeps
+# them in this process only (handy for local development)
+SESSION_STORE = os.environ.get("SESSION_STORE", "sqlite")
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", "sessions.db")
+# Sessions untouched for this long are deleted, e.g. interviews abandoned halfway
+SESSION_IDLE_SECONDS = int(os.environ.get("SESSION_IDLE_SECONDS", str(2 * 3600)))
+# Idle sessions are swept at most this often, piggybacking on writes
+SESSION_EVICT_INTERVAL_SECONDS = int(os.environ.get("SESSION_EVICT_INTERVAL_SECONDS", "300"))
+
+def serialize_state(state: dict) -> bytes:
+    """Compact JSON, zlib-compressed; interview transcripts shrink to a fraction of their size."""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+def deserialize_state(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+class SessionStore:
+    """
+    Interview state keyed by session ID.
+
+    Subclasses implement _read, _write, delete, session_ids and _delete_idle; eviction of idle
+    sessions is amortized over writes.
+    """
+
+    def __init__(self, idle_seconds: int = SESSION_IDLE_SECONDS,
+                 evict_interval_seconds: int = SESSION_EVICT_INTERVAL_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.evict_interval_seconds = evict_interval_seconds
+        self._last_eviction = time.time()
+
+    def load(self, session_id: str) -> dict:
+        """
+        Returns a session's state.
+
+        Returns:
+            dict: The stored state, or None for an unknown (or evicted) session.
+        """
+        if not session_id:
+            return None
+        data = self._read(session_id)
+        return deserialize_state(data) if data is not None else None
+
+    def save(self, session_id: str, state: dict):
+        """Stores a session's state, replacing the previous version."""
+        self._write(session_id, serialize_state(state), time.time())
+        if time.time() - self._last_eviction >= self.evict_interval_seconds:
+            self.evict_idle()
+
+    def evict_idle(self) -> int:
+        """Deletes sessions idle for longer than idle_seconds and returns how many there were."""
+        self._last_eviction = time.time()
+        evicted = self._delete_idle(time.time() - self.idle_seconds)
+        if evicted:
+            logging.info(f"Evicted {evicted} idle interview session(s).")
+        return evicted
+
+    def _read(self, session_id: str) -> bytes:
+        raise NotImplementedError
+
+    def _write(self, session_id: str, data: bytes, updated_at: float):
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def session_ids(self) -> list:
+        """Returns the IDs of all stored sessions, least recently updated first."""
+        raise NotImplementedError
+
+    def _delete_idle(self, cutoff: float) -> int:
+        raise NotImplementedError
+
+class MemorySessionStore(SessionStore):
+    """Keeps serialized sessions in a dictionary; state does not outlive the process."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def _read(self, session_id: str) -> bytes:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[0] if entry else None
+
+    def _write(self, session_id: str, data: bytes, updated_at: float):
+        with self._lock:
+            self._sessions[session_id] = (data, updated_at)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def session_ids(self) -> list:
+        with self._lock:
+            return sorted(self._sessions, key=lambda key: self._sessions[key][1])
+
+    def _delete_idle(self, cutoff: float) -> int:
+        with self._lock:
+            idle = [key for key, (_, updated_at) in self._sessions.items() if updated_at < cutoff]
+            for key in idle:
+                del self._sessions[key]
+            return len(idle)
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Stores sessions in an SQLite database in WAL mode, so several worker processes on
+    one host can share it: readers never block the writer, and each write is a single
+    short transaction.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        # sqlite3 connections may not be shared between threads
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode NORMAL only syncs at checkpoints; a power loss may drop the last
+            # few writes but never corrupts the database
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, session_id: str) -> bytes:
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def _write(self, session_id: str, data: bytes, updated_at: float):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (session_id, data, updated_at))
+
+    def delete(self, session_id: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def session_ids(self) -> list:
+        rows = self._connection().execute("SELECT session_id FROM sessions ORDER BY updated_at").fetchall()
+        return [row[0] for row in rows]
+
+    def _delete_idle(self, cutoff: float) -> int:
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+
+SESSION_STORES = {
+    "sqlite": SQLiteSessionStore,
+    "memory": MemorySessionStore,
+}
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Returns the process-wide session store selected by SESSION_STORE."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SESSION_STORES.get(SESSION_STORE, SQLiteSessionStore)()
+        return _default_store
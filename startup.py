@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import time
+import logging
+
+# resource is Unix-only; without it RSS is only read from /proc (i.e. on Linux)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Append one JSON line per process start to this file (unset: log and /metrics only), so
+# time-to-ready and baseline memory can be tracked across deploys and autoscaling events
+STARTUP_REPORT_FILE = os.environ.get("STARTUP_REPORT_FILE")
+
+# Fallback start time when the process start cannot be read from /proc
+_imported_at = time.time()
+_report = None
+
+def process_start_time() -> float:
+    """
+    Returns when this process started, as a Unix timestamp.
+
+    On Linux this comes from /proc, so interpreter start-up and every import before this
+    module are included; elsewhere it falls back to when this module was imported.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces, so fields are counted after its ")"
+            fields = f.read().rsplit(")", 1)[1].split()
+        started_ticks = int(fields[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return _imported_at
+
+def rss_bytes() -> int:
+    """
+    Returns the current resident set size, or the peak where the current one is unavailable.
+    Returns None where neither can be read (e.g. on Windows).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def mark_ready() -> dict:
+    """
+    Records that the app is ready to serve. Only the first call per process counts.
+
+    Returns:
+        dict: The startup report: time_to_ready_seconds, baseline_rss_bytes, pid and
+              the loaded module count.
+    """
+    global _report
+    if _report is not None:
+        return _report
+    _report = {
+        "pid": os.getpid(),
+        "time_to_ready_seconds": round(time.time() - process_start_time(), 3),
+        "baseline_rss_bytes": rss_bytes(),
+        "modules_loaded": len(sys.modules),
+    }
+    rss = _report["baseline_rss_bytes"]
+    logging.info(
+        f"Ready in {_report['time_to_ready_seconds']:.2f} s"
+        + (f" with {rss / (1024 * 1024):.1f} MiB resident" if rss is not None else "")
+        + f" ({_report['modules_loaded']} modules loaded)."
+    )
+    if STARTUP_REPORT_FILE:
+        try:
+            with open(STARTUP_REPORT_FILE, "a") as f:
+                f.write(json.dumps({"ts": time.time(), **_report}) + "\n")
+        except OSError as e:
+            logging.error(f"Could not write startup report to {STARTUP_REPORT_FILE}: {e}")
+    return _report
+
+def render_prometheus() -> str:
+    """Renders the startup gauges, plus the current RSS, in the Prometheus text format."""
+    lines = []
+    if _report is not None:
+        lines += [
+            "# TYPE interview_startup_time_to_ready_seconds gauge",
+            f"interview_startup_time_to_ready_seconds {_report['time_to_ready_seconds']}",
+        ]
+        if _report["baseline_rss_bytes"] is not None:
+            lines += [
+                "# TYPE interview_startup_baseline_rss_bytes gauge",
+                f"interview_startup_baseline_rss_bytes {_report['baseline_rss_bytes']}",
+            ]
+    rss = rss_bytes()
+    if rss is not None:
+        lines += [
+            "# TYPE interview_process_rss_bytes gauge",
+            f"interview_process_rss_bytes {rss}",
+        ]
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    # Measures a cold start of the app without serving it: imports app, builds the
+    # server and prints the report as JSON (run in a fresh process, e.g. in CI)
+    from clients import load_environment
+    load_environment()
+    import app
+    app.create_server()
+    print(json.dumps(mark_ready()))
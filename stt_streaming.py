@@ -0,0 +1,204 @@
+import os
+import wave
+import asyncio
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from stt_utils import transcribe_audio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Transcribe answers while they are being recorded instead of after submission
+STT_STREAMING = os.environ.get("STT_STREAMING", "0") == "1"
+# Which transcriber handles segments: "openai" (Whisper API) or "local" (faster-whisper)
+STT_BACKEND = os.environ.get("STT_BACKEND", "openai")
+STT_LOCAL_MODEL = os.environ.get("STT_LOCAL_MODEL", "base.en")
+
+# Segmentation parameters
+SILENCE_RMS = float(os.environ.get("STT_SILENCE_RMS", "0.01"))  # RMS of a normalized chunk below which it counts as silence
+SILENCE_SECONDS = 0.7     # Pause length that ends a segment
+MIN_SEGMENT_SECONDS = 2.0  # Don't cut segments shorter than this at a pause
+MAX_SEGMENT_SECONDS = 25.0  # Always cut once a segment gets this long
+
+# Segment transcriptions from all sessions share this pool
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("STT_STREAM_WORKERS", "4")), thread_name_prefix="stt-stream")
+
+# --- Pluggable Backends ---
+# A backend is any callable that takes the path of a WAV file and returns its text
+# (an empty string on failure), so the pipeline can run offline against a local model.
+
+_local_model = None
+
+def transcribe_audio_local(audio_filepath: str) -> str:
+    """
+    Transcribes audio with a local faster-whisper model, without any network access.
+
+    Args:
+        audio_filepath (str): The path to the audio file to be transcribed.
+
+    Returns:
+        str: The transcribed text. Returns an empty string on failure.
+    """
+    global _local_model
+    try:
+        if _local_model is None:
+            from faster_whisper import WhisperModel
+            _local_model = WhisperModel(STT_LOCAL_MODEL, compute_type="int8")
+        segments, _ = _local_model.transcribe(audio_filepath)
+        return " ".join(segment.text.strip() for segment in segments)
+    except ImportError:
+        logging.error("faster-whisper is not installed. Local transcription is unavailable.")
+        return ""
+    except Exception as e:
+        logging.error(f"An error occurred during local audio transcription: {e}")
+        return ""
+
+TRANSCRIPTION_BACKENDS = {
+    "openai": transcribe_audio,
+    "local": transcribe_audio_local,
+}
+
+def get_transcription_backend(name: str = None):
+    """Returns the transcriber callable for a backend name, defaulting to STT_BACKEND."""
+    return TRANSCRIPTION_BACKENDS.get(name or STT_BACKEND, transcribe_audio)
+
+# --- Incremental Transcription ---
+
+class StreamingTranscriber:
+    """
+    Buffers microphone chunks for one answer and transcribes it segment by segment.
+
+    Incoming audio is cut at pauses (an energy-based silence check) and each finished
+    segment is transcribed in the background while the candidate keeps speaking, so
+    at submit time only the final segment is still outstanding.
+    """
+
+    def __init__(self, session_id: str, backend=None):
+        self.session_id = session_id
+        self.backend = backend or get_transcription_backend()
+        self.sample_rate = None
+        self._buffer = []
+        self._buffered_samples = 0
+        self._silent_samples = 0
+        self._speech_seconds = 0.0
+        self._futures = []
+        self._lock = threading.Lock()
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self._futures or self._buffered_samples)
+
+    @property
+    def speech_seconds(self) -> float:
+        """Seconds of non-silent audio received so far."""
+        return self._speech_seconds
+
+    def add_chunk(self, sample_rate: int, samples):
+        """
+        Adds one streamed microphone chunk, cutting a segment at a long enough pause.
+
+        Args:
+            sample_rate (int): The chunk's sample rate.
+            samples (np.ndarray): Integer or float PCM samples, mono or (n, channels).
+        """
+        chunk = _to_mono_float(samples)
+        if not len(chunk):
+            return
+        with self._lock:
+            if self.sample_rate and sample_rate != self.sample_rate:
+                # The browser changed the stream format; close off what came before
+                self._cut_segment()
+            self.sample_rate = sample_rate
+            self._buffer.append(chunk)
+            self._buffered_samples += len(chunk)
+
+            if np.sqrt(np.mean(chunk ** 2)) < SILENCE_RMS:
+                self._silent_samples += len(chunk)
+            else:
+                self._silent_samples = 0
+                self._speech_seconds += len(chunk) / sample_rate
+
+            buffered_seconds = self._buffered_samples / sample_rate
+            paused = self._silent_samples / sample_rate >= SILENCE_SECONDS
+            if (paused and buffered_seconds >= MIN_SEGMENT_SECONDS) or buffered_seconds >= MAX_SEGMENT_SECONDS:
+                self._cut_segment()
+
+    def _cut_segment(self):
+        # Must be called with self._lock held
+        if not self._buffer:
+            return
+        samples = np.concatenate(self._buffer)
+        self._buffer, self._buffered_samples, self._silent_samples = [], 0, 0
+        if np.sqrt(np.mean(samples ** 2)) < SILENCE_RMS:
+            # Nothing but silence; not worth an API call
+            return
+        path = _write_wav(samples, self.sample_rate)
+        self._futures.append(_executor.submit(self._transcribe_segment, path))
+
+    def _transcribe_segment(self, path: str) -> str:
+        try:
+            return self.backend(path)
+        finally:
+            os.remove(path)
+
+    def finish(self) -> str:
+        """Transcribes the remaining audio and returns the full answer text."""
+        with self._lock:
+            self._cut_segment()
+            futures, self._futures = self._futures, []
+        return _join_segments(future.result() for future in futures)
+
+    async def finish_async(self) -> str:
+        """Asyncio variant of finish."""
+        with self._lock:
+            self._cut_segment()
+            futures, self._futures = self._futures, []
+        texts = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        return _join_segments(texts)
+
+def _to_mono_float(samples) -> np.ndarray:
+    samples = np.asarray(samples)
+    if np.issubdtype(samples.dtype, np.integer):
+        samples = samples.astype(np.float32) / np.iinfo(samples.dtype).max
+    else:
+        samples = samples.astype(np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples
+
+def _write_wav(samples: np.ndarray, sample_rate: int) -> str:
+    fd, path = tempfile.mkstemp(suffix=".wav", prefix="stt_segment_")
+    os.close(fd)
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return path
+
+def _join_segments(texts) -> str:
+    return " ".join(t.strip() for t in texts if t and t.strip())
+
+# --- Per-session Registry ---
+
+_transcribers = {}
+_transcribers_lock = threading.Lock()
+
+def get_stream_transcriber(session_id: str, create: bool = False) -> StreamingTranscriber:
+    """Returns the session's in-progress transcriber, optionally creating it."""
+    with _transcribers_lock:
+        transcriber = _transcribers.get(session_id)
+        if transcriber is None and create:
+            transcriber = _transcribers[session_id] = StreamingTranscriber(session_id)
+        return transcriber
+
+def pop_stream_transcriber(session_id: str) -> StreamingTranscriber:
+    """Removes and returns the session's transcriber so the next answer starts fresh."""
+    with _transcribers_lock:
+        return _transcribers.pop(session_id, None)
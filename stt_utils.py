@@ -1,27 +1,151 @@
 import os
-from openai import OpenAI
+import asyncio
+import tempfile
 import logging
+import numpy as np
+
+from clients import get_client, get_async_client
+from memo_cache import get_memo_cache, content_key, file_digest
+from metrics import span
+from resilience import call, call_async
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Initialize OpenAI client from environment variable
-try:
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-except Exception as e:
-    logging.error(f"Failed to initialize OpenAI client for STT: {e}")
-    client = None
+# --- Audio Pre-processing ---
+# Browser recordings arrive as large stereo WAVs with silence at both ends. Whisper only
+# needs 16 kHz mono speech, so recordings are downmixed, resampled, trimmed and
+# re-encoded before upload, which shrinks both the upload and the billed duration.
+
+STT_PREPROCESS = os.environ.get("STT_PREPROCESS", "1") == "1"
+TARGET_SAMPLE_RATE = 16000
+# Container/codec/bitrate of the upload; Opus handles speech well at low bitrates
+UPLOAD_FORMAT = os.environ.get("STT_UPLOAD_FORMAT", "ogg")
+UPLOAD_CODEC = os.environ.get("STT_UPLOAD_CODEC", "libopus")
+UPLOAD_BITRATE = os.environ.get("STT_UPLOAD_BITRATE", "24k")
+
+VAD_FRAME_MS = 30
+# A frame counts as speech when its RMS exceeds this multiple of the noise floor...
+VAD_NOISE_MULTIPLIER = 3.0
+# ...and this absolute level (normalized RMS), so near-silent files aren't trimmed to noise
+VAD_MIN_RMS = 0.005
+# Audio kept on either side of detected speech so word edges aren't clipped
+VAD_PADDING_MS = 200
+
+def _speech_bounds(audio: "AudioSegment") -> tuple:
+    """Returns the (start_ms, end_ms) span containing speech, using frame RMS energy."""
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    frame_len = int(audio.frame_rate * VAD_FRAME_MS / 1000)
+    num_frames = len(samples) // frame_len
+    if num_frames == 0:
+        return 0, len(audio)
+
+    frames = samples[:num_frames * frame_len].reshape(num_frames, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    threshold = max(VAD_MIN_RMS, np.percentile(rms, 10) * VAD_NOISE_MULTIPLIER)
+    voiced = np.flatnonzero(rms > threshold)
+    if not len(voiced):
+        return 0, len(audio)
+
+    start_ms = max(0, int(voiced[0]) * VAD_FRAME_MS - VAD_PADDING_MS)
+    end_ms = min(len(audio), (int(voiced[-1]) + 1) * VAD_FRAME_MS + VAD_PADDING_MS)
+    return start_ms, end_ms
+
+def speech_duration(audio_filepath: str) -> float:
+    """
+    Returns the seconds of detected speech in a recording (from first to last voiced frame).
+
+    Returns:
+        float: The speech duration, or None if the file cannot be decoded.
+    """
+    try:
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(audio_filepath).set_channels(1)
+        start_ms, end_ms = _speech_bounds(audio)
+        return (end_ms - start_ms) / 1000
+    except Exception as e:
+        logging.error(f"Could not measure speech duration for {audio_filepath}: {e}")
+        return None
+
+def preprocess_audio(audio_filepath: str) -> str:
+    """
+    Downmixes, resamples, trims silence from and compresses a recording for upload.
+
+    Args:
+        audio_filepath (str): The path to the original recording.
+
+    Returns:
+        str: The path to a new, compressed temporary file, or the original path if
+             pre-processing fails. The caller owns (and should delete) the new file.
+    """
+    try:
+        with span("preprocess_audio", bytes=os.path.getsize(audio_filepath)):
+            return _preprocess_audio(audio_filepath)
+    except Exception as e:
+        logging.error(f"Audio pre-processing failed, uploading original file: {e}")
+        return audio_filepath
+
+def _preprocess_audio(audio_filepath: str) -> str:
+    # pydub is imported on first use; it is slow to import and unused until the first answer
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(audio_filepath)
+    original_size = os.path.getsize(audio_filepath)
+    original_seconds = audio.duration_seconds
+
+    audio = audio.set_channels(1).set_frame_rate(TARGET_SAMPLE_RATE)
+    start_ms, end_ms = _speech_bounds(audio)
+    audio = audio[start_ms:end_ms]
+
+    fd, output_path = tempfile.mkstemp(suffix=f".{UPLOAD_FORMAT}", prefix="stt_upload_")
+    os.close(fd)
+    audio.export(output_path, format=UPLOAD_FORMAT, codec=UPLOAD_CODEC, bitrate=UPLOAD_BITRATE)
+
+    logging.info(
+        f"Pre-processed {os.path.basename(audio_filepath)}: "
+        f"{original_size} -> {os.path.getsize(output_path)} bytes, "
+        f"{original_seconds:.1f} -> {audio.duration_seconds:.1f} s"
+    )
+    return output_path
+
+# --- Memoized Transcriptions ---
+# Transcripts are memoized by a hash of the recording's content (plus the model and the
+# pre-processing switch), so a recording submitted again, e.g. after a UI retry, is not
+# uploaded twice. use_cache=False skips the lookup but still stores the new transcript.
+
+def _cached_transcript(audio_filepath: str, use_cache: bool) -> tuple:
+    """Returns (memo key, cached transcript or None); the key is None without a memo cache."""
+    cache = get_memo_cache()
+    if not cache:
+        return None, None
+    try:
+        key = content_key("whisper-1", STT_PREPROCESS, file_digest(audio_filepath))
+    except OSError as e:
+        # Unreadable here means the upload fails too, with its own error handling
+        logging.error(f"Could not hash {audio_filepath} for the memo cache: {e}")
+        return None, None
+    if not use_cache:
+        cache.record_bypass("transcribe_audio")
+        return key, None
+    return key, cache.get("transcribe_audio", key)
+
+def _store_transcript(key: str, text: str):
+    cache = get_memo_cache()
+    if cache and key and text:
+        cache.put("transcribe_audio", key, text)
 
-def transcribe_audio(audio_filepath: str) -> str:
+def transcribe_audio(audio_filepath: str, use_cache: bool = True) -> str:
     """
     Transcribes audio from a given file path using the OpenAI Whisper API.
 
     Args:
         audio_filepath (str): The path to the audio file to be transcribed.
+        use_cache (bool): Whether a memoized transcript of identical audio may be returned.
 
     Returns:
         str: The transcribed text. Returns an empty string on failure.
     """
+    client = get_client()
     if not client:
         logging.error("OpenAI client not initialized. Transcription failed.")
         return ""
@@ -30,15 +154,83 @@ def transcribe_audio(audio_filepath: str) -> str:
         logging.error(f"Audio file not found at: {audio_filepath}")
         return ""
 
+    memo_key, cached = _cached_transcript(audio_filepath, use_cache)
+    if cached:
+        return cached
+
+    upload_path = preprocess_audio(audio_filepath) if STT_PREPROCESS else audio_filepath
     try:
-        with open(audio_filepath, "rb") as audio_file:
+        # Read once up front so a hedged duplicate request can upload the same bytes
+        audio_bytes = _read_bytes(upload_path)
+        with span("transcribe_audio", model="whisper-1", bytes=len(audio_bytes)):
             # Call the Whisper API for transcription
-            transcription = client.audio.transcriptions.create(
+            transcription = call("transcribe_audio", lambda timeout: client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(os.path.basename(upload_path), audio_bytes),
+                timeout=timeout
+            ), upstream="audio")
+        logging.info("Audio transcribed successfully.")
+        text = transcription.text
+    except Exception as e:
+        logging.error(f"An error occurred during audio transcription: {e}")
+        return ""
+    finally:
+        if upload_path != audio_filepath:
+            os.remove(upload_path)
+
+    # Stored outside the try so a memo cache failure never discards the transcript
+    _store_transcript(memo_key, text)
+    return text
+
+async def transcribe_audio_async(audio_filepath: str, use_cache: bool = True) -> str:
+    """
+    Asyncio variant of transcribe_audio, backed by the shared pooled AsyncOpenAI client.
+
+    Args:
+        audio_filepath (str): The path to the audio file to be transcribed.
+        use_cache (bool): Whether a memoized transcript of identical audio may be returned.
+
+    Returns:
+        str: The transcribed text. Returns an empty string on failure.
+    """
+    aclient = get_async_client()
+    if not aclient:
+        logging.error("Async OpenAI client not initialized. Transcription failed.")
+        return ""
+
+    if not os.path.exists(audio_filepath):
+        logging.error(f"Audio file not found at: {audio_filepath}")
+        return ""
+
+    # Hashing reads the whole recording, so it runs off the event loop too
+    memo_key, cached = await asyncio.to_thread(_cached_transcript, audio_filepath, use_cache)
+    if cached:
+        return cached
+
+    # Decoding and encoding are CPU-bound, so they run off the event loop
+    upload_path = await asyncio.to_thread(preprocess_audio, audio_filepath) if STT_PREPROCESS else audio_filepath
+    try:
+        # Read the recording off the event loop; uploads can be several megabytes
+        audio_bytes = await asyncio.to_thread(_read_bytes, upload_path)
+        with span("transcribe_audio", model="whisper-1", bytes=len(audio_bytes)):
+            transcription = await call_async("transcribe_audio", lambda timeout: aclient.audio.transcriptions.create(
                 model="whisper-1",
-                file=audio_file
-            )
+                file=(os.path.basename(upload_path), audio_bytes),
+                timeout=timeout
+            ), upstream="audio")
         logging.info("Audio transcribed successfully.")
-        return transcription.text
+        text = transcription.text
     except Exception as e:
         logging.error(f"An error occurred during audio transcription: {e}")
         return ""
+    finally:
+        if upload_path != audio_filepath:
+            os.remove(upload_path)
+
+    # Stored outside the try so a memo cache failure never discards the transcript
+    await asyncio.to_thread(_store_transcript, memo_key, text)
+    return text
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
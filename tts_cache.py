@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+from metrics import span
+
+# fcntl is POSIX-only; without it the index is still written atomically, but concurrent
+# worker processes may occasionally lose each other's counter updates.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "tts_cache")
+# Total size of cached audio files before least-recently-used entries are evicted
+CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Lookups record last-access times and hit/miss counts in memory; they are merged into
+# the index at most this often (and on every write), so a cache hit never takes the lock
+INDEX_FLUSH_SECONDS = float(os.environ.get("TTS_CACHE_FLUSH_SECONDS", "10"))
+
+INDEX_FILENAME = "index.json"
+LOCK_FILENAME = ".index.lock"
+
+def cache_key(text: str, lang: str, voice: str, engine: str) -> str:
+    """
+    Returns a stable, content-addressed key for a rendered utterance.
+
+    Unlike the built-in hash(), the digest is identical across processes and restarts,
+    so every worker shares the same cache entries.
+    """
+    payload = json.dumps([engine, voice, lang, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class TTSCache:
+    """
+    On-disk cache of synthesized audio with an LRU byte budget.
+
+    Audio files are stored as <key>.<ext> next to an index.json that records each
+    entry's size and last access time, plus hit/miss counters. Every index update
+    re-reads the index under a file lock so several worker processes can share one
+    cache directory. Lookups read a copy of the index that is refreshed only when the
+    file changes, and buffer their access times and counters until the next flush.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self._thread_lock = threading.Lock()
+        # The index as last read, and what lookups have seen since the last flush
+        self._pending_lock = threading.Lock()
+        self._entries = {}
+        self._index_mtime = None
+        self._accessed = {}
+        self._stale = set()
+        self._hits = 0
+        self._misses = 0
+        self._last_flush = time.monotonic()
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+            logging.info(f"Created TTS cache directory at: {cache_dir}")
+
+    # --- Index handling ---
+
+    @contextmanager
+    def _locked_index(self):
+        """Yields the current index for modification and writes it back atomically."""
+        with self._thread_lock:
+            lock_file = open(os.path.join(self.cache_dir, LOCK_FILENAME), "a")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                index = self._read_index()
+                yield index
+                self._write_atomic(self.index_path, json.dumps(index).encode("utf-8"))
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault("entries", {})
+        index.setdefault("hits", 0)
+        index.setdefault("misses", 0)
+        return index
+
+    def _known_entries(self) -> dict:
+        # Re-read only when another thread or worker has rewritten the index
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self._pending_lock:
+            if mtime == self._index_mtime:
+                return self._entries
+        entries = self._read_index()["entries"]
+        with self._pending_lock:
+            self._entries, self._index_mtime = entries, mtime
+        return entries
+
+    def _merge_pending(self, index: dict):
+        # Must be called inside _locked_index
+        with self._pending_lock:
+            accessed, self._accessed = self._accessed, {}
+            stale, self._stale = self._stale, set()
+            hits, misses = self._hits, self._misses
+            self._hits = self._misses = 0
+            self._last_flush = time.monotonic()
+        for key, last_access in accessed.items():
+            entry = index["entries"].get(key)
+            if entry:
+                entry["last_access"] = max(entry["last_access"], last_access)
+        # Stale entries (file removed by hand or by another worker) are dropped
+        for key in stale:
+            entry = index["entries"].get(key)
+            if entry and not os.path.exists(entry["path"]):
+                del index["entries"][key]
+        index["hits"] += hits
+        index["misses"] += misses
+
+    def flush(self):
+        """
+        Writes the buffered access times and hit/miss counters to the index.
+
+        Also runs at exit, when the cache directory may already have been removed (e.g. a
+        temporary directory in tests), so a missing directory is logged rather than raised.
+        """
+        try:
+            with self._locked_index() as index:
+                self._merge_pending(index)
+        except OSError as e:
+            logging.warning(f"Could not flush the TTS cache index in {self.cache_dir}: {e}")
+
+    def _write_atomic(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # --- Public API ---
+
+    def path_for(self, key: str, ext: str = "mp3") -> str:
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def get(self, key: str) -> str:
+        """
+        Looks up an entry, counting the hit or miss and refreshing its LRU position.
+
+        Returns:
+            str: The cached file path, or None on a miss.
+        """
+        with span("tts_cache_lookup") as lookup:
+            entry = self._known_entries().get(key)
+            hit = entry is not None and os.path.exists(entry["path"])
+            with self._pending_lock:
+                if hit:
+                    self._accessed[key] = time.time()
+                    self._hits += 1
+                else:
+                    # Stale entries count as misses
+                    self._misses += 1
+                    if entry:
+                        self._stale.add(key)
+                due = time.monotonic() - self._last_flush >= INDEX_FLUSH_SECONDS
+            if due:
+                self.flush()
+            if hit:
+                lookup.set(cache="hit", bytes=entry["size"])
+                return entry["path"]
+            lookup.set(cache="miss")
+            return None
+
+    def put(self, key: str, render, ext: str = "mp3") -> str:
+        """
+        Renders an entry atomically and records it in the index.
+
+        Args:
+            key (str): The entry's cache key.
+            render (callable): Called with a temporary file path to write the audio to.
+            ext (str): The audio file extension.
+
+        Returns:
+            str: The final cached file path.
+        """
+        path = self.path_for(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            render(tmp_path)
+            # Readers only ever see the complete file under its final name
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._locked_index() as index:
+            # Eviction needs the latest access times
+            self._merge_pending(index)
+            index["entries"][key] = {"path": path, "size": os.path.getsize(path), "last_access": time.time()}
+            self._evict(index, keep=key)
+        return path
+
+    def get_or_create(self, key: str, render, ext: str = "mp3") -> str:
+        """Returns the cached file for a key, rendering it on a miss."""
+        return self.get(key) or self.put(key, render, ext)
+
+    def _evict(self, index: dict, keep: str = None):
+        # Must be called inside _locked_index
+        entries = index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del entries[key]
+            logging.info(f"Evicted TTS cache entry: {entry['path']}")
+
+    def stats(self) -> dict:
+        """Returns entry count, total bytes and hit/miss counters."""
+        with self._locked_index() as index:
+            self._merge_pending(index)
+            entries = index["entries"]
+            lookups = index["hits"] + index["misses"]
+            return {
+                "entries": len(entries),
+                "bytes": sum(e["size"] for e in entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": index["hits"],
+                "misses": index["misses"],
+                "hit_rate": round(index["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+    def prune_orphans(self) -> int:
+        """Deletes audio files in the cache directory that the index does not know about."""
+        with self._locked_index() as index:
+            known = {os.path.basename(e["path"]) for e in index["entries"].values()}
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name in known or name in (INDEX_FILENAME, LOCK_FILENAME) or name.endswith(".tmp"):
+                continue
+            os.remove(os.path.join(self.cache_dir, name))
+            removed += 1
+        return removed
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache() -> TTSCache:
+    """Returns the process-wide TTS cache, creating the cache directory on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TTSCache()
+            # Buffered access times and counters are not lost at a clean exit
+            atexit.register(_default_cache.flush)
+        return _default_cache
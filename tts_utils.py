@@ -1,20 +1,45 @@
 import os
-from gtts import gTTS
+import re
+import sys
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from pydub import AudioSegment
+
+# Run as a script, this module is the entry point: .env is loaded before any module
+# (this one included) reads its settings
+if __name__ == "__main__":
+    from clients import load_environment
+    load_environment()
+
+from clients import get_client
+from tts_cache import cache_key, get_cache
+from metrics import span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-CACHE_DIR = "tts_cache"
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
-    logging.info(f"Created TTS cache directory at: {CACHE_DIR}")
+# Language used for every engine
+TTS_LANG = os.environ.get("TTS_LANG", "en")
+# Voice for engines that offer several (gTTS has a single voice per language)
+TTS_VOICE = os.environ.get("TTS_VOICE", "alloy")
+# Which engine speak_text uses: "gtts" or "openai"
+TTS_ENGINE = os.environ.get("TTS_ENGINE", "gtts")
+
+# Stream question audio sentence by sentence instead of as one clip
+TTS_STREAMING = os.environ.get("TTS_STREAMING", "0") == "1"
+# Sentences shorter than this are merged into the next one to avoid choppy playback
+MIN_CHUNK_CHARS = 20
+
+# Spoken between questions while the previous answer is being evaluated
+TRANSITION_TEXT = "Thank you for your answer. Now for the next question."
+# Fixed phrases worth pre-rendering before the first candidate arrives
+COMMON_PHRASES = [TRANSITION_TEXT]
 
 def speak_text_gtts(text: str) -> str:
     """
     Converts text to speech using gTTS, saves it as an MP3, and returns the file path.
-    A simple hashing mechanism is used for caching.
+    Results are stored in the persistent, content-addressed TTS cache.
 
     Args:
         text (str): The text to be converted to speech.
@@ -23,50 +48,202 @@ def speak_text_gtts(text: str) -> str:
         str: The file path of the generated audio file. Returns None on failure.
     """
     try:
-        # Create a simple, filename-safe hash of the text for caching
-        filename = f"{hash(text)}.mp3"
-        filepath = os.path.join(CACHE_DIR, filename)
-
-        # If the file already exists in the cache, return its path
-        if os.path.exists(filepath):
-            logging.info(f"TTS audio found in cache: {filepath}")
-            return filepath
-        
-        # Generate the audio file using gTTS
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(filepath)
-        
-        # Optional: Convert to a different format or bitrate if needed using pydub
-        # For example, to ensure compatibility or reduce file size.
-        # sound = AudioSegment.from_mp3(filepath)
-        # sound.export(filepath, format="mp3", bitrate="128k")
-
-        logging.info(f"TTS audio generated and saved to: {filepath}")
+        key = cache_key(text, TTS_LANG, "default", "gtts")
+
+        def render(path):
+            # Imported on first render; gTTS pulls in requests and its language tables
+            from gtts import gTTS
+            # Generate the audio file using gTTS
+            gTTS(text=text, lang=TTS_LANG, slow=False).save(path)
+
+        with span("speak_text", model="gtts", chars=len(text)):
+            filepath = get_cache().get_or_create(key, render)
+        logging.info(f"TTS audio ready at: {filepath}")
         return filepath
     except Exception as e:
         logging.error(f"gTTS failed to generate audio: {e}")
         return None
 
+def speak_text_openai(text: str) -> str:
+    """
+    Converts text to speech using OpenAI's TTS API, cached like speak_text_gtts.
+
+    Args:
+        text (str): The text to be converted to speech.
+
+    Returns:
+        str: The file path of the generated audio file. Returns None on failure.
+    """
+    try:
+        key = cache_key(text, TTS_LANG, TTS_VOICE, "openai-tts-1")
+
+        def render(path):
+            with get_client().audio.speech.with_streaming_response.create(
+                model="tts-1",
+                voice=TTS_VOICE,
+                input=text
+            ) as response:
+                response.stream_to_file(path)
+
+        with span("speak_text", model="tts-1", chars=len(text)):
+            filepath = get_cache().get_or_create(key, render)
+        logging.info(f"TTS audio ready at: {filepath}")
+        return filepath
+    except Exception as e:
+        logging.error(f"OpenAI TTS failed to generate audio: {e}")
+        return None
+
+def get_audio_duration(filepath: str) -> float:
+    """
+    Returns the playback duration of an audio file in seconds.
+
+    Args:
+        filepath (str): The path to the audio file.
+
+    Returns:
+        float: The duration in seconds. Returns None if the file cannot be decoded.
+    """
+    if not filepath:
+        return None
+    try:
+        from pydub import AudioSegment
+        return AudioSegment.from_file(filepath).duration_seconds
+    except Exception as e:
+        logging.error(f"Could not determine audio duration for {filepath}: {e}")
+        return None
+
 # --- Pluggable Architecture ---
-# You can easily swap the TTS engine by changing this function call in app.py.
-# For example, to use OpenAI's TTS or ElevenLabs, create a function like
-# speak_text_openai(text) and call that instead.
-
-# Example for OpenAI TTS (requires `openai` library):
-# from openai import OpenAI
-# client = OpenAI()
-# def speak_text_openai(text: str) -> str:
-#     filename = f"{hash(text)}.mp3"
-#     filepath = os.path.join(CACHE_DIR, filename)
-#     if os.path.exists(filepath):
-#         return filepath
-#     response = client.audio.speech.create(
-#         model="tts-1",
-#         voice="alloy",
-#         input=text
-#     )
-#     response.stream_to_file(filepath)
-#     return filepath
+# The TTS engine is selected with the TTS_ENGINE environment variable. To add another
+# engine (e.g. ElevenLabs), write a speak_text_<engine>(text) function that renders
+# through get_cache() with its own engine/voice in the cache key, and register it here.
+TTS_ENGINES = {
+    "gtts": speak_text_gtts,
+    "openai": speak_text_openai,
+}
 
 # Set the default TTS function to use
-speak_text = speak_text_gtts
+speak_text = TTS_ENGINES.get(TTS_ENGINE, speak_text_gtts)
+
+async def speak_text_async(text: str) -> str:
+    """
+    Asyncio variant of speak_text. The configured TTS engine is blocking, so it is
+    run on a worker thread to keep the event loop free for other sessions.
+
+    Args:
+        text (str): The text to be converted to speech.
+
+    Returns:
+        str: The file path of the generated audio file. Returns None on failure.
+    """
+    # Resolve speak_text at call time so a swapped-in engine is picked up
+    return await asyncio.to_thread(speak_text, text)
+
+async def get_audio_duration_async(filepath: str) -> float:
+    """Asyncio variant of get_audio_duration; decoding runs on a worker thread."""
+    return await asyncio.to_thread(get_audio_duration, filepath)
+
+# --- Streaming Synthesis ---
+# Long utterances are split into sentences that are synthesized concurrently through the
+# configured engine and handed out in order, so playback starts after the first sentence
+# instead of the whole text. Each sentence goes through speak_text and is therefore cached
+# on its own, whichever engine is selected.
+
+def split_sentences(text: str) -> list:
+    """
+    Splits text into sentence-sized chunks for streaming synthesis.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The chunks in order. Very short sentences are merged with the following one.
+    """
+    chunks = []
+    pending = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        pending = f"{pending} {sentence}".strip()
+        if len(pending) >= MIN_CHUNK_CHARS:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+def speak_text_stream(text: str, engine=None):
+    """
+    Synthesizes text sentence by sentence, yielding each chunk's file path in order.
+
+    Args:
+        text (str): The text to be converted to speech.
+        engine (callable): The TTS function to use. Defaults to the configured speak_text.
+
+    Yields:
+        str: File paths of the audio chunks. Chunks that fail to render are skipped.
+    """
+    engine = engine or speak_text
+    sentences = split_sentences(text)
+    with ThreadPoolExecutor(max_workers=max(1, len(sentences))) as executor:
+        futures = [executor.submit(engine, sentence) for sentence in sentences]
+        for future in futures:
+            path = future.result()
+            if path:
+                yield path
+
+async def speak_text_stream_async(text: str, engine=None):
+    """Asyncio variant of speak_text_stream."""
+    engine = engine or speak_text
+    tasks = [asyncio.create_task(asyncio.to_thread(engine, sentence)) for sentence in split_sentences(text)]
+    try:
+        for task in tasks:
+            path = await task
+            if path:
+                yield path
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# --- Cache Warm-up ---
+
+def warm_up_cache(extra_phrases: list = None) -> int:
+    """
+    Pre-renders the common phrases and the static fallback questions into the TTS cache.
+
+    Args:
+        extra_phrases (list): Additional texts to render.
+
+    Returns:
+        int: The number of phrases that failed to render.
+    """
+    from llm_utils import load_static_questions
+
+    phrases = COMMON_PHRASES + [q["text"] for q in load_static_questions()] + (extra_phrases or [])
+    if TTS_STREAMING:
+        # Streaming playback looks questions up per sentence, but the common phrases (the
+        # transition) are still played as whole clips
+        phrases = COMMON_PHRASES + [chunk for phrase in phrases for chunk in split_sentences(phrase)]
+    phrases = list(dict.fromkeys(phrases))
+    failures = 0
+    for phrase in phrases:
+        if not speak_text(phrase):
+            failures += 1
+    logging.info(f"Warmed TTS cache with {len(phrases) - failures} phrase(s); {failures} failed.")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the persistent TTS cache.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    warm_parser = subcommands.add_parser("warm", help="Pre-render common phrases and static questions.")
+    warm_parser.add_argument("phrases", nargs="*", help="Extra phrases to render.")
+    subcommands.add_parser("stats", help="Print cache size and hit/miss counters.")
+    subcommands.add_parser("prune", help="Delete audio files not tracked by the cache index.")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        sys.exit(1 if warm_up_cache(args.phrases) else 0)
+    elif args.command == "stats":
+        print(get_cache().stats())
+    elif args.command == "prune":
+        print(f"Removed {get_cache().prune_orphans()} orphaned file(s).")
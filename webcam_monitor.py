@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# --- Settings ---
+# Webcam frames are sampled at a low rate, shrunk on arrival and analysed by a small
+# dedicated worker pool. The queue in between is bounded and drops its oldest frames,
+# so monitoring load never backs up into the answer pipeline.
+
+WEBCAM_MONITORING = os.environ.get("WEBCAM_MONITORING", "1") == "1"
+# Frames per second analysed per candidate; the browser is asked to send no more than this
+WEBCAM_SAMPLE_FPS = float(os.environ.get("WEBCAM_SAMPLE_FPS", "1"))
+# Frames are downscaled (by whole-pixel striding) to at most this width before queueing
+WEBCAM_FRAME_WIDTH = int(os.environ.get("WEBCAM_FRAME_WIDTH", "160"))
+# Frames waiting for analysis across all sessions; beyond this the oldest are dropped
+WEBCAM_QUEUE_DEPTH = int(os.environ.get("WEBCAM_QUEUE_DEPTH", "64"))
+WEBCAM_WORKERS = int(os.environ.get("WEBCAM_WORKERS", "2"))
+
+# Signal thresholds (on 0-255 luminance)
+# Below this contrast the camera is covered, off or facing a blank wall
+PRESENCE_MIN_STD = 12.0
+# Mean absolute change between consecutive frames above which the candidate is moving
+MOTION_THRESHOLD = 10.0
+# Share of skin-toned pixels in the centre of the frame above which a face is assumed there
+FACE_MIN_SKIN_FRACTION = 0.08
+
+# Per-question counters: frames analysed, and how many showed each condition
+COUNTER_NAMES = ("frames", "absent", "motion", "no_face")
+
+# --- Frame Signals ---
+
+def downscale(frame) -> np.ndarray:
+    """
+    Shrinks an RGB(A) or grayscale frame to at most WEBCAM_FRAME_WIDTH pixels wide.
+
+    Striding instead of resampling keeps this cheap enough for the request thread; the
+    signals below only need coarse pixels.
+
+    Returns:
+        np.ndarray: A uint8 array of shape (height, width, 3).
+    """
+    frame = np.asarray(frame)
+    if frame.ndim == 2:
+        frame = np.repeat(frame[:, :, None], 3, axis=2)
+    step = max(1, -(-frame.shape[1] // WEBCAM_FRAME_WIDTH))
+    # Copy, so the queued frame does not keep the full-size one alive
+    return np.ascontiguousarray(frame[::step, ::step, :3], dtype=np.uint8)
+
+def frame_signals(frame: np.ndarray, previous_luma: np.ndarray = None) -> dict:
+    """
+    Computes cheap presence, motion and face-in-frame signals for one downscaled frame.
+
+    Args:
+        frame (np.ndarray): A uint8 RGB frame, as returned by downscale.
+        previous_luma (np.ndarray): The luminance of the session's previous frame, if any.
+
+    Returns:
+        dict: present, moving and face (bools), plus luma for the next call.
+    """
+    rgb = frame.astype(np.float32)
+    r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+    luma = 0.299 * r + 0.587 * g + 0.114 * b
+    present = bool(luma.std() >= PRESENCE_MIN_STD)
+
+    moving = False
+    if previous_luma is not None and previous_luma.shape == luma.shape:
+        moving = bool(np.abs(luma - previous_luma).mean() >= MOTION_THRESHOLD)
+
+    # Skin tones fall in a compact Cb/Cr box regardless of brightness; a face in frame
+    # shows up as enough skin-toned pixels in the central region
+    height, width = luma.shape
+    centre = (slice(height // 6, height - height // 6), slice(width // 4, width - width // 4))
+    cb = 128 - 0.168736 * r[centre] - 0.331264 * g[centre] + 0.5 * b[centre]
+    cr = 128 + 0.5 * r[centre] - 0.418688 * g[centre] - 0.081312 * b[centre]
+    skin = (cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)
+    face = present and bool(skin.mean() >= FACE_MIN_SKIN_FRACTION)
+
+    return {"present": present, "moving": moving, "face": face, "luma": luma}
+
+# --- Per-session Monitor ---
+
+class SessionMonitor:
+    """
+    Accumulates frame signals for one candidate, bucketed by question.
+
+    Frames are tagged with the question showing when they were sampled; next_question
+    hands over the finished question's counters, and frames of that question that are
+    analysed afterwards are discarded rather than counted against the next one.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.question = 0
+        self._counters = {}
+        self._previous_luma = None
+        self._last_sampled = 0.0
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        """Rate-limits frames to WEBCAM_SAMPLE_FPS, whatever the browser actually sends."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sampled < 1.0 / WEBCAM_SAMPLE_FPS:
+                return False
+            self._last_sampled = now
+            return True
+
+    def record(self, question: int, signals: dict):
+        with self._lock:
+            self._previous_luma = signals["luma"]
+            if question != self.question:
+                return
+            counters = self._counters.setdefault(question, dict.fromkeys(COUNTER_NAMES, 0))
+            counters["frames"] += 1
+            counters["absent"] += not signals["present"]
+            counters["motion"] += signals["moving"]
+            counters["no_face"] += not signals["face"]
+
+    @property
+    def previous_luma(self) -> np.ndarray:
+        return self._previous_luma
+
+    def next_question(self) -> dict:
+        """
+        Closes the current question's bucket and starts the next one.
+
+        Returns:
+            dict: The finished question's counters (all zero if no frames arrived).
+        """
+        with self._lock:
+            counters = self._counters.pop(self.question, None) or dict.fromkeys(COUNTER_NAMES, 0)
+            self.question += 1
+            return counters
+
+# --- Bounded Queue and Workers ---
+
+class FrameQueue:
+    """A bounded, thread-safe queue that drops its oldest item when full."""
+
+    def __init__(self, maxlen: int = WEBCAM_QUEUE_DEPTH):
+        self._items = deque(maxlen=maxlen)
+        self._not_empty = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._not_empty:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def get(self):
+        with self._not_empty:
+            while not self._items:
+                self._not_empty.wait()
+            return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+_queue = FrameQueue()
+_monitors = {}
+_monitors_lock = threading.Lock()
+_workers = []
+_stats = {"sampled": 0, "skipped": 0, "analysed": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+def _count(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+def _worker():
+    while True:
+        monitor, question, frame = _queue.get()
+        try:
+            monitor.record(question, frame_signals(frame, monitor.previous_luma))
+            _count("analysed")
+        except Exception as e:
+            _count("failed")
+            logging.error(f"Webcam frame analysis failed for session {monitor.session_id}: {e}")
+
+def _ensure_workers():
+    # Must be called with _monitors_lock held; threads start with the first frame
+    while len(_workers) < WEBCAM_WORKERS:
+        thread = threading.Thread(target=_worker, name=f"webcam-{len(_workers)}", daemon=True)
+        thread.start()
+        _workers.append(thread)
+
+def get_monitor(session_id: str, create: bool = False) -> SessionMonitor:
+    """Returns the session's monitor, optionally creating it."""
+    with _monitors_lock:
+        monitor = _monitors.get(session_id)
+        if monitor is None and create:
+            monitor = _monitors[session_id] = SessionMonitor(session_id)
+            _ensure_workers()
+        return monitor
+
+def pop_monitor(session_id: str) -> SessionMonitor:
+    """Removes and returns the session's monitor, e.g. when the interview ends."""
+    with _monitors_lock:
+        return _monitors.pop(session_id, None)
+
+def submit_frame(session_id: str, frame) -> bool:
+    """
+    Samples, downscales and queues one webcam frame for background analysis.
+
+    Returns:
+        bool: Whether the frame was queued (False if it was skipped by the sampler).
+    """
+    if not WEBCAM_MONITORING or frame is None or not session_id:
+        return False
+    monitor = get_monitor(session_id, create=True)
+    if not monitor.should_sample():
+        _count("skipped")
+        return False
+    _queue.put((monitor, monitor.question, downscale(frame)))
+    _count("sampled")
+    return True
+
+def take_question_counters(session_id: str) -> dict:
+    """
+    Returns the monitoring counters for the session's current question and moves on to
+    the next one. Counters are all zero when the webcam sent nothing.
+    """
+    monitor = get_monitor(session_id)
+    return monitor.next_question() if monitor else dict.fromkeys(COUNTER_NAMES, 0)
+
+def render_prometheus() -> str:
+    """Renders the frame pipeline counters and queue depth in the Prometheus text format."""
+    lines = ["# TYPE interview_webcam_frames_total counter"]
+    for outcome, value in _stats.items():
+        lines.append(f'interview_webcam_frames_total{{outcome="{outcome}"}} {value}')
+    lines.append(f'interview_webcam_frames_total{{outcome="dropped"}} {_queue.dropped}')
+    lines.append("# TYPE interview_webcam_queue_depth gauge")
+    lines.append(f"interview_webcam_queue_depth {len(_queue)}")
+    return "\n".join(lines) + "\n"